@@ -0,0 +1,94 @@
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Simple load generator for a running server (uvicorn main:app)
+# Usage: python bench_endpoints.py --requests 2000 --concurrency 100 /api/courses/ /api/users/me
+# --accept-encoding gzip|br compares latency and bytes on the wire with compression;
+# --login-burst N fires N concurrent logins while the paths are measured, to compare
+# cheap endpoint latency with and without a sign-in storm running next to it.
+
+HEADERS = {}
+
+def fetch(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(urllib.request.Request(url, headers=HEADERS)) as response:
+        size = len(response.read()) # urllib doesn't decompress: this is what crossed the wire
+        status = response.status
+    return status, time.perf_counter() - start, size
+
+def login(base_url, username, password):
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(f"{base_url}/api/auth/login", data=body) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code # 503 once the hashing queue is full
+    return status, time.perf_counter() - start
+
+def login_burst(base_url, username, password, total, stop):
+    # Keeps `total` logins in flight until stop is set
+    def worker():
+        results = []
+        while not stop.is_set():
+            results.append(login(base_url, username, password))
+        return results
+
+    with ThreadPoolExecutor(max_workers=total) as pool:
+        futures = [pool.submit(worker) for _ in range(total)]
+    results = [r for f in futures for r in f.result()]
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(r[1] for r in results if r[0] == 200) or [0]
+    print(f"{'login burst':<30} {len(results)} logins   p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms   statuses {statuses}")
+
+def bench(base_url, path, total, concurrency):
+    url = f"{base_url}{path}"
+    fetch(url) # warm up
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [url] * total))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[1] for r in results)
+    errors = sum(1 for r in results if r[0] != 200)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    size = sum(r[2] for r in results) / len(results)
+    print(f"{path:<30} {total / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   {size:9.0f} B   errors {errors}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=["/api/courses/", "/api/users/me"])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--accept-encoding", default=None, help="e.g. gzip or br")
+    parser.add_argument("--login-burst", type=int, default=0, help="concurrent logins to run alongside")
+    parser.add_argument("--username", default="student")
+    parser.add_argument("--password", default="password")
+    args = parser.parse_args()
+    if args.accept_encoding:
+        HEADERS["Accept-Encoding"] = args.accept_encoding
+
+    stop = threading.Event()
+    burst = None
+    if args.login_burst:
+        burst = threading.Thread(target=login_burst, args=(args.base_url, args.username, args.password, args.login_burst, stop))
+        burst.start()
+        time.sleep(1) # let the burst saturate first
+
+    for path in args.paths:
+        bench(args.base_url, path, args.requests, args.concurrency)
+
+    if burst is not None:
+        stop.set()
+        burst.join()
@@ -1,7 +1,6 @@
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import inspect
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./skilltree.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+from database import engine
 
 inspector = inspect(engine)
 columns = inspector.get_columns('skills')
@@ -0,0 +1,101 @@
+import gzip
+import os
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError: # optional: gzip only without it
+    brotli = None
+
+# Negotiated response compression (br > gzip) for JSON/text bodies over a size threshold.
+# Streaming responses (SSE chat, NDJSON bulk analysis) pass through untouched so
+# their events aren't held back. Bodies that carry an ETag (see response_cache.py)
+# are the same bytes for a whole cache version, so their compressed form is kept too.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+compressed_cache = TTLCache(maxsize=512, ttl=300)
+
+
+def choose_encoding(accept_encoding):
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def maybe_compress(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message # held until we see the body
+                return
+            if start is None or message["type"] != "http.response.body":
+                return await send(message)
+
+            held, start = start, None
+            headers = list(held.get("headers", []))
+            names = {name.lower(): value for name, value in headers}
+            body = message.get("body", b"")
+            if (
+                message.get("more_body")
+                or len(body) < self.minimum_size
+                or b"content-encoding" in names
+                or not names.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(held)
+                return await send(message)
+
+            etag = names.get(b"etag")
+            key = (etag, scope["path"], scope["query_string"], encoding) if etag else None
+            compressed = compressed_cache.get(key) if key else None
+            if compressed is None:
+                compressed = compress(body, encoding)
+                if key:
+                    compressed_cache.set(key, compressed)
+
+            headers = [(name, value) for name, value in headers if name.lower() not in (b"content-length", b"vary")]
+            vary = names.get(b"vary")
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**held, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, maybe_compress)
@@ -0,0 +1,180 @@
+import os
+import threading
+from collections import Counter
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from cache import TTLCache
+import models
+
+# Per-user dashboard documents.
+# The payload is assembled from UserCourse/UserProgress/UserBadge once and then
+# served from memory; the write paths call invalidate_dashboard(user_id).
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "10000"))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "3600")) # safety net only
+
+# Learning paths group courses by category
+LEARNING_PATHS = [
+    {"id": "cse-cyber", "title": "Cyber Security Specialist", "category": "Cyber Security", "totalCourses": 5},
+    {"id": "cse-ai", "title": "AI & Machine Learning Engineer", "category": "AI", "totalCourses": 6},
+]
+
+dashboard_cache = TTLCache(maxsize=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL)
+# Bumped on every invalidation, so a document built across one isn't stored
+_generations = Counter()
+_lock = threading.Lock()
+
+
+def invalidate_dashboard(*user_ids):
+    with _lock:
+        for user_id in user_ids:
+            _generations[user_id] += 1
+            dashboard_cache.pop(user_id)
+
+
+def invalidate_dashboard_on_commit(session, user_ids):
+    # For ORM hooks, which fire at flush: drop the documents once the write commits,
+    # otherwise a read inside the transaction window caches the old state again
+    if session is None:
+        invalidate_dashboard(*user_ids)
+    else:
+        session.info.setdefault("dashboard_users", set()).update(user_ids)
+
+
+def guest_dashboard():
+    return {
+        "user": {"name": "Guest", "level": 0, "xp": 0, "streak": 0, "badges": []},
+        "courses": [],
+        "learningPaths": _learning_paths([]),
+    }
+
+
+def _learning_paths(courses):
+    paths = []
+    for path in LEARNING_PATHS:
+        in_path = [c for c in courses if c["category"] == path["category"]]
+        completed = [c for c in in_path if c["progress"] >= 100]
+        current = next((c["title"] for c in in_path if c["progress"] < 100), None)
+        paths.append({
+            "id": path["id"],
+            "title": path["title"],
+            "progress": round(sum(c["progress"] for c in in_path) / path["totalCourses"]),
+            "totalCourses": path["totalCourses"],
+            "completedCourses": len(completed),
+            "currentCourse": current or "Start your journey",
+        })
+    return paths
+
+
+async def build_dashboard(db, user_id):
+    user = await db.get(models.User, user_id)
+    if user is None:
+        return None
+
+    badges = (await db.execute(
+        select(models.Badge.name)
+        .join(models.UserBadge, models.UserBadge.badge_id == models.Badge.id)
+        .where(models.UserBadge.user_id == user_id)
+        .order_by(models.UserBadge.awarded_at)
+    )).scalars().all()
+
+    # Course progress comes from the enrollment counters (see progress.py), the same
+    # numbers /api/users/me/courses and /api/courses/{id}/status report
+    enrolled = (await db.execute(
+        select(
+            models.Course.id,
+            models.Course.title,
+            models.Course.category,
+            models.Course.image_url,
+            models.UserCourse.progress_percent,
+        )
+        .join(models.UserCourse, models.UserCourse.course_id == models.Course.id)
+        .where(models.UserCourse.user_id == user_id)
+        .order_by(models.UserCourse.enrolled_at)
+    )).all()
+    course_ids = [c.id for c in enrolled]
+
+    # Lessons per module for the enrolled courses, for the module completion counts
+    module_totals = (await db.execute(
+        select(models.Module.course_id, models.Module.id, func.count(models.Lesson.id))
+        .outerjoin(models.Lesson, models.Lesson.module_id == models.Module.id)
+        .where(models.Module.course_id.in_(course_ids))
+        .group_by(models.Module.course_id, models.Module.id)
+    )).all()
+
+    # Completed lessons per module for this user
+    module_done = dict((await db.execute(
+        select(models.Lesson.module_id, func.count(models.UserProgress.id))
+        .join(models.UserProgress, models.UserProgress.lesson_id == models.Lesson.id)
+        .where(models.UserProgress.user_id == user_id, models.UserProgress.completed.is_(True))
+        .group_by(models.Lesson.module_id)
+    )).all())
+
+    stats = {course_id: {"modules": 0, "modules_done": 0} for course_id in course_ids}
+    for course_id, module_id, lesson_count in module_totals:
+        course_stats = stats[course_id]
+        course_stats["modules"] += 1
+        if lesson_count and module_done.get(module_id, 0) >= lesson_count:
+            course_stats["modules_done"] += 1
+
+    courses = []
+    for course in enrolled:
+        course_stats = stats[course.id]
+        courses.append({
+            "id": course.id,
+            "title": course.title,
+            "category": course.category,
+            "progress": course.progress_percent or 0,
+            "totalModules": course_stats["modules"],
+            "completedModules": course_stats["modules_done"],
+            "image": course.image_url,
+        })
+
+    return {
+        "user": {
+            "name": user.username,
+            "role": user.role,
+            "level": user.level,
+            "xp": user.xp,
+            "streak": user.streak_days,
+            "badges": list(badges),
+        },
+        "courses": courses,
+        "learningPaths": _learning_paths(courses),
+    }
+
+
+async def get_dashboard(db, user_id):
+    # Cache hit is a single key lookup; a miss builds and stores the document
+    document = dashboard_cache.get(user_id)
+    if document is None:
+        generation = _generations[user_id]
+        document = await build_dashboard(db, user_id)
+        if document is None:
+            return guest_dashboard()
+        # A write that landed while the build ran may not be in it; serve it once, don't cache it
+        with _lock:
+            if _generations[user_id] == generation:
+                dashboard_cache.set(user_id, document)
+    return document
+
+
+# Badges are awarded outside the request handlers (seed scripts, admin tools),
+# so hook the ORM instead of individual call sites.
+@event.listens_for(models.UserBadge, "after_insert")
+@event.listens_for(models.UserBadge, "after_delete")
+def _badge_changed(mapper, connection, target):
+    invalidate_dashboard_on_commit(object_session(target), [target.user_id])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    user_ids = session.info.pop("dashboard_users", None)
+    if user_ids:
+        invalidate_dashboard(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("dashboard_users", None)
@@ -1,14 +1,118 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./skilltree.db"
+# docker-compose sets DATABASE_URL; fall back to the local dev database
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./skilltree.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Pool settings (ignored for in-memory SQLite). Keep size + overflow above anyio's
+# 40 worker threads: sync endpoints release their session in a worker thread, so a
+# smaller pool can deadlock under load.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite tuning, applied on every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # negative = KiB
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers keep going while a writer holds the lock
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+
+# Async drivers used for the AsyncSession path
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "psycopg",
+}
+
+
+def to_async_url(database_url):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+def _engine_kwargs(url):
+    kwargs = {}
+
+    if url.get_backend_name() == "sqlite":
+        # Sessions are handed across threadpool workers by FastAPI
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            # One shared connection, otherwise every checkout sees an empty database
+            kwargs["poolclass"] = StaticPool
+        else:
+            kwargs["pool_size"] = DB_POOL_SIZE
+            kwargs["max_overflow"] = DB_MAX_OVERFLOW
+            kwargs["pool_timeout"] = DB_POOL_TIMEOUT
+    else:
+        kwargs["pool_size"] = DB_POOL_SIZE
+        kwargs["max_overflow"] = DB_MAX_OVERFLOW
+        kwargs["pool_timeout"] = DB_POOL_TIMEOUT
+        kwargs["pool_recycle"] = DB_POOL_RECYCLE
+        kwargs["pool_pre_ping"] = True
+    return kwargs
+
+
+def create_db_engine(database_url=SQLALCHEMY_DATABASE_URL, **overrides):
+    url = make_url(database_url)
+    kwargs = _engine_kwargs(url)
+    kwargs.update(overrides)
+    db_engine = create_engine(url, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+
+    return db_engine
+
+
+def create_async_db_engine(database_url=SQLALCHEMY_DATABASE_URL, **overrides):
+    url = to_async_url(database_url)
+    kwargs = _engine_kwargs(url)
+    if url.get_backend_name() == "sqlite":
+        # aiosqlite runs each connection on its own thread already
+        kwargs.pop("connect_args", None)
+    kwargs.update(overrides)
+    db_engine = create_async_engine(url, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for endpoints that should not hold a threadpool slot while waiting on the DB
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,3 +121,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def upsert_insert(model):
+    # INSERT that supports .on_conflict_do_update()/.on_conflict_do_nothing() on our dialect
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
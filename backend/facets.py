@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+import models
+
+# Facet counts for catalog browsing (branch, year, semester, category) served
+# from memory instead of a GROUP BY over courses x subjects per click.
+# The aggregate is two small maps: course counts per (subject, category) cell and
+# each subject's (branch, year, semester). Committed ORM writes adjust them in
+# place (moving a subject to another branch/year is one dict update); a full
+# reload every FACET_REFRESH_SECONDS picks up writes made by other processes or
+# raw SQL scripts and evens out any drift.
+FACET_REFRESH_SECONDS = float(os.getenv("FACET_REFRESH_SECONDS", "300"))
+DIMENSIONS = ("branch_id", "year", "semester", "category")
+SUBJECT_FIELDS = ("branch_id", "year", "semester")
+NO_SUBJECT = (None, None, None)
+
+
+class FacetCube:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cells = Counter() # (subject_id, category) -> courses
+        self.subjects = {} # subject_id -> (branch_id, year, semester)
+        self.loaded_at = None
+
+    def load(self, cells, subjects):
+        # cells: (subject_id, category, count) rows; subjects: (id, branch_id, year, semester) rows
+        cells = Counter({(subject_id, category): count for subject_id, category, count in cells})
+        subjects = {id: tuple(dims) for id, *dims in subjects}
+        with self._lock:
+            self.cells, self.subjects = cells, subjects
+            self.loaded_at = time.monotonic()
+
+    def stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > FACET_REFRESH_SECONDS
+
+    def apply(self, changes):
+        with self._lock:
+            for change in changes:
+                if change[0] == "course":
+                    _, subject_id, category, delta = change
+                    cell = (subject_id, category)
+                    self.cells[cell] += delta
+                    if self.cells[cell] <= 0:
+                        del self.cells[cell]
+                else:
+                    _, subject_id, dims = change
+                    if dims is None:
+                        self.subjects.pop(subject_id, None)
+                    else:
+                        self.subjects[subject_id] = dims
+
+    def counts(self, **filters):
+        # -> (courses matching every filter, {dimension: Counter(value -> courses)}).
+        # Each dimension is counted under all filters except its own, so the other
+        # values of a selected facet keep their counts.
+        with self._lock:
+            rows = [(*self.subjects.get(subject_id, NO_SUBJECT), category, count)
+                    for (subject_id, category), count in self.cells.items()]
+        wanted = [(i, filters[name]) for i, name in enumerate(DIMENSIONS) if filters.get(name) is not None]
+        facets = {name: Counter() for name in DIMENSIONS}
+        total = 0
+        for row in rows:
+            misses = [i for i, value in wanted if row[i] != value]
+            if not misses:
+                total += row[-1]
+                for i, name in enumerate(DIMENSIONS):
+                    facets[name][row[i]] += row[-1]
+            elif len(misses) == 1:
+                facets[DIMENSIONS[misses[0]]][row[misses[0]]] += row[-1]
+        return total, facets
+
+
+def facet_values(counter):
+    # [{"value", "count"}] in value order; courses without that dimension are left out
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted((value, count) for value, count in counter.items() if value is not None and count > 0)
+    ]
+
+
+facet_cube = FacetCube()
+_refresh_lock = asyncio.Lock()
+
+
+async def get_cube(db):
+    # Current cube; (re)loaded with two grouped reads when missing or stale
+    if facet_cube.stale():
+        async with _refresh_lock:
+            if facet_cube.stale():
+                cells = (await db.execute(
+                    select(models.Course.subject_id, models.Course.category, func.count())
+                    .group_by(models.Course.subject_id, models.Course.category)
+                )).all()
+                subjects = (await db.execute(
+                    select(models.Subject.id, *(getattr(models.Subject, field) for field in SUBJECT_FIELDS))
+                )).all()
+                facet_cube.load(cells, subjects)
+    return facet_cube
+
+
+# ORM writes are collected at flush and applied once the transaction commits,
+# so a rollback leaves the cube untouched.
+def _pending(target):
+    session = object_session(target)
+    return session.info.setdefault("facet_changes", []) if session is not None else []
+
+
+def _old(state, field):
+    history = state.attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(state.object, field)
+
+
+@event.listens_for(models.Course, "after_insert")
+def _course_added(mapper, connection, target):
+    _pending(target).append(("course", target.subject_id, target.category, 1))
+
+
+@event.listens_for(models.Course, "after_update")
+def _course_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.subject_id.history.has_changes() or state.attrs.category.history.has_changes():
+        _pending(target).extend([
+            ("course", _old(state, "subject_id"), _old(state, "category"), -1),
+            ("course", target.subject_id, target.category, 1),
+        ])
+
+
+@event.listens_for(models.Course, "after_delete")
+def _course_removed(mapper, connection, target):
+    state = inspect(target)
+    _pending(target).append(("course", _old(state, "subject_id"), _old(state, "category"), -1))
+
+
+@event.listens_for(models.Subject, "after_insert")
+@event.listens_for(models.Subject, "after_update")
+def _subject_changed(mapper, connection, target):
+    _pending(target).append(("subject", target.id, tuple(getattr(target, field) for field in SUBJECT_FIELDS)))
+
+
+@event.listens_for(models.Subject, "after_delete")
+def _subject_removed(mapper, connection, target):
+    _pending(target).append(("subject", target.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes = session.info.pop("facet_changes", None)
+    if changes:
+        facet_cube.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("facet_changes", None)
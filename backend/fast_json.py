@@ -0,0 +1,86 @@
+import typing
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# Opt-in fast response path: ORM rows straight to JSON bytes.
+# A serializer is compiled once per response schema (field names, defaults and
+# nested schemas resolved up front) and rows are dumped with orjson, skipping the
+# per-row pydantic validation and the stdlib encoder. Routes keep their
+# response_model for the OpenAPI docs and return fast_response(...) instead.
+# Values are emitted as stored: no validation or coercion happens on this path.
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z # datetimes formatted like pydantic's ("...Z" for UTC)
+
+_MISSING = object()
+_compiled = {}
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return content if isinstance(content, bytes) else orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def _nested(annotation):
+    # (schema, is_list) for BaseModel / List[BaseModel] / Optional[...] fields, else None
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _nested(args[0]) if len(args) == 1 else None
+    if origin in (list, typing.List):
+        inner = typing.get_args(annotation)
+        if inner and isinstance(inner[0], type) and issubclass(inner[0], BaseModel):
+            return inner[0], True
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+def serializer(schema, fields=None):
+    # Compiled row -> dict function for a pydantic schema, optionally limited to a
+    # tuple of its top-level fields (cached per schema and field set)
+    compiled = _compiled.get((schema, fields))
+    if compiled is not None:
+        return compiled
+
+    plain = []
+    nested = []
+    for name, field in schema.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        sub = _nested(field.annotation)
+        if sub is None:
+            plain.append((name, default))
+        else:
+            nested.append((name, default, serializer(sub[0]), sub[1]))
+    plain = tuple(plain)
+
+    def to_dict(row):
+        data = {name: getattr(row, name, default) for name, default in plain}
+        for name, default, sub_dict, many in nested:
+            value = getattr(row, name, default)
+            if value is None or value is _MISSING:
+                data[name] = None
+            elif many:
+                data[name] = [sub_dict(item) for item in value]
+            else:
+                data[name] = sub_dict(value)
+        return data
+
+    _compiled[(schema, fields)] = to_dict
+    return to_dict
+
+
+def fast_response(schema, content, fields=None, **kwargs):
+    # content: one ORM row (or column-select Row) or a list of them
+    to_dict = serializer(schema, fields)
+    if isinstance(content, (list, tuple)):
+        data = [to_dict(row) for row in content]
+    else:
+        data = to_dict(content)
+    return FastJSONResponse(orjson.dumps(data, option=ORJSON_OPTIONS), **kwargs)
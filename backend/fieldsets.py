@@ -0,0 +1,26 @@
+from fastapi import HTTPException
+
+# Sparse fieldsets for list endpoints: ?fields=id,title,image_url limits both the
+# response fields and the columns the SELECT reads, so card views skip the
+# unbounded description Text. The id is always included (it keys the row for the
+# client and the keyset cursor). Without fields= every schema field is returned.
+ALWAYS_INCLUDED = ("id",)
+
+
+def parse_fields(fields, schema):
+    # -> tuple of field names in schema order; 400 on names the schema doesn't have
+    available = tuple(schema.model_fields)
+    if fields is None:
+        return available
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    requested.update(ALWAYS_INCLUDED)
+    return tuple(name for name in available if name in requested)
+
+
+def columns(model, names):
+    # The model's columns for those names; schema-only fields fall back to their defaults
+    table_columns = model.__table__.columns
+    return [getattr(model, name) for name in names if name in table_columns]
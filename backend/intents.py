@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+
+from phrase_matcher import PhraseMatcher
+
+# AI instructor intents: keywords/synonyms -> response and optional action link.
+# Static intents live in intents.json; one intent per course is added from the
+# catalog. Everything is compiled into a single PhraseMatcher, so resolving a
+# message is linear in its length however many intents exist.
+
+INTENTS_FILE = os.getenv("INTENTS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json"))
+
+FALLBACK_RESPONSE = "That's an interesting topic! As an AI instructor, I can help you find resources about '{message}'."
+
+
+def load_intents(path=INTENTS_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def course_intents(courses):
+    # One intent per course, matched on its full title
+    return [
+        {
+            "id": f"course-{course.id}",
+            "keywords": [course.title],
+            "response": f"'{course.title}' sounds like a great fit. Take a look at the course page to get started.",
+            "action_link": f"/course/{course.id}",
+            "action_text": "Open Course",
+        }
+        for course in courses
+    ]
+
+
+class IntentIndex:
+    def __init__(self, intents=()):
+        self._intents = []
+        self._matcher = PhraseMatcher()
+        self._lock = threading.Lock()
+        for intent in intents:
+            self.add(intent)
+
+    def add(self, intent):
+        with self._lock:
+            index = len(self._intents)
+            self._intents.append(intent)
+            for phrase in intent.get("keywords", []) + intent.get("synonyms", []):
+                self._matcher.add(phrase, index)
+
+    def replace(self, prefix, intents):
+        # Swap every intent whose id starts with prefix (e.g. the course intents)
+        kept = [i for i in self._intents if not i["id"].startswith(prefix)]
+        rebuilt = IntentIndex(kept + list(intents))
+        rebuilt._matcher.compile()
+        with self._lock:
+            self._intents, self._matcher = rebuilt._intents, rebuilt._matcher
+
+    def __len__(self):
+        return len(self._intents)
+
+    def match(self, message):
+        # Score = sum over matched phrase occurrences of (phrase length in words * intent weight);
+        # ties go to the intent declared first
+        with self._lock:
+            intents, matcher = self._intents, self._matcher
+            if not matcher._compiled:
+                matcher.compile()
+
+        seen = set()
+        scores = {}
+        for start, end, index in matcher.finditer(message):
+            if (start, end, index) in seen:
+                continue
+            seen.add((start, end, index))
+            weight = intents[index].get("weight", 1.0)
+            scores[index] = scores.get(index, 0) + (end - start) * weight
+
+        if not scores:
+            return None
+        best = max(scores, key=lambda index: (scores[index], -index))
+        return intents[best]
+
+    def reply(self, message):
+        intent = self.match(message)
+        if intent is None:
+            return {"response": FALLBACK_RESPONSE.format(message=message), "action_link": None, "action_text": None}
+        return {
+            "response": intent["response"],
+            "action_link": intent.get("action_link"),
+            "action_text": intent.get("action_text"),
+        }
+
+
+intent_index = IntentIndex(load_intents())
@@ -0,0 +1,139 @@
+import asyncio
+import math
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+
+from skill_index import SkillIndex
+import models
+import skill_catalog
+
+# TF-IDF index of job postings over the skill vocabulary, for resume recommendations.
+# Each posting is a sparse row of sublinear skill frequencies (1 + log count) and idf
+# is applied at query time from the document frequencies, so new postings only append
+# rows and bump df; nothing already indexed is re-extracted. Ranking one resume against
+# every posting is a couple of sparse mat-vec products and a partial sort.
+JOB_INDEX_REFRESH_SECONDS = float(os.getenv("JOB_INDEX_REFRESH_SECONDS", "30"))
+RECOMMENDED_JOBS = int(os.getenv("RECOMMENDED_JOBS", "3"))
+RANK_CHUNK = 64 # queries scored per dense block, keeps bulk ranking memory flat
+
+POSTING_COLUMNS = (
+    models.JobPosting.id,
+    models.JobPosting.title,
+    models.JobPosting.company,
+    models.JobPosting.location,
+    models.JobPosting.salary_range,
+    models.JobPosting.description,
+)
+
+
+class JobIndex:
+    def __init__(self, version, skills):
+        # version/skills: a skill_catalog snapshot; a new catalog means a new index
+        self.version = version
+        self.skill_index = SkillIndex(skills)
+        self.columns = {skill_id: column for column, skill_id in enumerate(self.skill_index.skills)}
+        self.columns_by_name = {
+            skill[1].lower(): self.columns[skill_id] for skill_id, skill in self.skill_index.skills.items()
+        }
+        self.last_id = 0
+        width = len(self.columns)
+        # (tf, df, postings, row norms), swapped as a whole so readers never see half an append
+        self._state = (sparse.csr_matrix((0, width)), np.zeros(width), [], np.zeros(0))
+
+    def __len__(self):
+        return len(self._state[2])
+
+    def vectorize(self, texts):
+        data, indices, indptr = [], [], [0]
+        for text in texts:
+            for skill_id, count in self.skill_index.extract(text).items():
+                indices.append(self.columns[skill_id])
+                data.append(1.0 + math.log(count))
+            indptr.append(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(self.columns)))
+
+    def append(self, rows):
+        # rows: (id, title, company, location, salary_range, description), ascending id
+        if not rows:
+            return
+        tf, df, postings, _ = self._state
+        block = self.vectorize([f"{row[1]}\n{row[5] or ''}" for row in rows])
+        tf = sparse.vstack([tf, block], format="csr")
+        df = df + np.bincount(block.indices, minlength=len(self.columns))
+        postings = postings + [
+            {"id": row[0], "title": row[1], "company": row[2], "location": row[3], "salary_range": row[4]}
+            for row in rows
+        ]
+        # idf moved for every posting, so refresh all norms (one pass over the nonzeros)
+        norms = np.sqrt(tf.multiply(tf) @ self.idf(df, len(postings)) ** 2)
+        self._state = (tf, df, postings, norms)
+        self.last_id = rows[-1][0]
+
+    @staticmethod
+    def idf(df, n):
+        return np.log((1 + n) / (1 + df)) + 1
+
+    def rank(self, queries, k=RECOMMENDED_JOBS):
+        # queries: lists of skill names (a resume's skills_found). Returns, per query,
+        # up to k postings by cosine similarity with a 0-100 match_score.
+        tf, df, postings, norms = self._state
+        if not postings or not queries:
+            return [[] for _ in queries]
+        idf2 = self.idf(df, len(postings)) ** 2
+
+        rows, columns = [], []
+        for row, names in enumerate(queries):
+            found = {self.columns_by_name[n.lower()] for n in names if n.lower() in self.columns_by_name}
+            rows.extend([row] * len(found))
+            columns.extend(found)
+        q = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(queries), len(self.columns)))
+        q_norms = np.sqrt(q @ idf2)
+
+        ranked = []
+        safe_norms = np.where(norms > 0, norms, 1.0)
+        for start in range(0, len(queries), RANK_CHUNK):
+            chunk = q[start:start + RANK_CHUNK]
+            scores = (tf @ chunk.multiply(idf2).T.tocsc()).toarray() / safe_norms[:, None]
+            for column in range(scores.shape[1]):
+                q_norm = q_norms[start + column]
+                col = scores[:, column] / (q_norm if q_norm > 0 else 1.0)
+                top = min(k, len(col))
+                best = np.argpartition(-col, top - 1)[:top]
+                best = best[np.argsort(-col[best], kind="stable")]
+                ranked.append([
+                    {**postings[i], "match_score": int(round(100 * col[i]))}
+                    for i in best if col[i] > 0
+                ])
+        return ranked
+
+
+_index = None
+_checked = 0.0
+_lock = asyncio.Lock()
+
+
+async def get_index(db, force=False):
+    # Current index; new postings are appended at most every JOB_INDEX_REFRESH_SECONDS
+    # (immediately with force=True), a changed skill catalog rebuilds it.
+    global _index, _checked
+    catalog = await skill_catalog.get_catalog(db)
+    index = _index
+    if (index is not None and index.version == catalog.version and not force
+            and time.monotonic() - _checked < JOB_INDEX_REFRESH_SECONDS):
+        return index
+    async with _lock:
+        index = _index
+        if index is None or index.version != catalog.version:
+            index = JobIndex(catalog.version, catalog.skills)
+        rows = (await db.execute(
+            select(*POSTING_COLUMNS).where(models.JobPosting.id > index.last_id).order_by(models.JobPosting.id)
+        )).all()
+        await asyncio.to_thread(index.append, [tuple(row) for row in rows])
+        _index = index
+        _checked = time.monotonic()
+    return index
+
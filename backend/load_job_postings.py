@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+
+from database import SessionLocal
+from models import JobPosting
+
+# Loads job postings from a JSON file (a list of objects with title, company,
+# location, salary_range and description). Postings already present (same title
+# and company) are skipped. A running API picks new postings up on its next index refresh.
+# The API seeds an empty table from the bundled job_postings.json at startup, so this
+# script is only needed to add more postings.
+
+BUNDLED_POSTINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_postings.json")
+
+def read_postings(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def seed_job_postings(db, path=BUNDLED_POSTINGS):
+    # Fresh installs: fill an empty job_postings table so recommendations work out of the box
+    if db.query(JobPosting.id).first() is not None or not os.path.exists(path):
+        return 0
+    postings = read_postings(path)
+    db.add_all(JobPosting(**p_data) for p_data in postings)
+    db.commit()
+    return len(postings)
+
+def load_job_postings(path=BUNDLED_POSTINGS):
+    db = SessionLocal()
+    postings = read_postings(path)
+
+    print(f"Loading job postings from {path}...")
+    existing = set(db.query(JobPosting.title, JobPosting.company).all())
+    added = 0
+    for p_data in postings:
+        if (p_data["title"], p_data["company"]) in existing:
+            continue
+        db.add(JobPosting(**p_data))
+        existing.add((p_data["title"], p_data["company"]))
+        added += 1
+
+    db.commit()
+    print(f"Added {added} job postings ({len(postings) - added} already present).")
+    db.close()
+
+if __name__ == "__main__":
+    load_job_postings(*sys.argv[1:])
@@ -0,0 +1,19 @@
+from database import engine
+import models
+
+# Composite indexes behind keyset pagination of the course catalog
+CATALOG_INDEXES = [
+    (models.Subject.__table__, "ix_subjects_branch_year_id"),
+    (models.Course.__table__, "ix_courses_subject_id_id"),
+]
+
+def migrate():
+    print("Migrating catalog indexes...")
+    for table, index_name in CATALOG_INDEXES:
+        index = next(i for i in table.indexes if i.name == index_name)
+        index.create(bind=engine, checkfirst=True)
+        print(f"Ensured {index_name} on {table.name}.")
+    print("Migration complete.")
+
+if __name__ == "__main__":
+    migrate()
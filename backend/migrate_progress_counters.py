@@ -0,0 +1,23 @@
+from database import engine
+from sqlalchemy import text
+from progress import recount_enrollments
+
+def migrate():
+    print("Migrating UserCourse completion counters...")
+    for column in ("completed_lessons", "total_lessons"):
+        with engine.connect() as conn:
+            try:
+                conn.execute(text(f"ALTER TABLE user_courses ADD COLUMN {column} INTEGER DEFAULT 0"))
+                conn.commit()
+                print(f"Added {column} to user_courses.")
+            except Exception as e:
+                print(f"Column {column} likely exists or error: {e}")
+
+    # Backfill from UserProgress; safe to re-run whenever counters look off
+    with engine.begin() as conn:
+        recount_enrollments(conn)
+    print("Recounted completed/total lessons for every enrollment.")
+    print("Migration complete.")
+
+if __name__ == "__main__":
+    migrate()
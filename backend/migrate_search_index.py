@@ -0,0 +1,17 @@
+from database import engine
+from search_index import SEARCH_TABLE, ensure_search_index
+
+# FTS5 search table over courses, subjects and lessons, its sync triggers, and a
+# full backfill. The app creates it on first start; rerun this to rebuild it.
+def migrate():
+    print("Migrating search index...")
+    if not ensure_search_index(engine, rebuild=True):
+        print("Skipped: full-text search needs SQLite with FTS5.")
+        return
+    with engine.connect() as conn:
+        count = conn.exec_driver_sql(f"SELECT count(*) FROM {SEARCH_TABLE}").scalar()
+    print(f"Indexed {count} rows into {SEARCH_TABLE}.")
+    print("Migration complete.")
+
+if __name__ == "__main__":
+    migrate()
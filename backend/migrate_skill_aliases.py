@@ -0,0 +1,14 @@
+from database import engine
+from sqlalchemy import text
+
+def add_alias_column():
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE skills ADD COLUMN aliases VARCHAR"))
+            conn.commit()
+            print("Successfully added aliases column to skills.")
+        except Exception as e:
+            print(f"Error (column might already exist): {e}")
+
+if __name__ == "__main__":
+    add_alias_column()
@@ -0,0 +1,30 @@
+from database import engine
+from sqlalchemy import text
+import models
+
+# (table, index, key columns) for the composite unique indexes the upserts rely on
+UNIQUE_INDEXES = [
+    (models.UserProgress.__table__, "ix_user_progress_user_lesson", ("user_id", "lesson_id")),
+    (models.UserCourse.__table__, "ix_user_courses_user_course", ("user_id", "course_id")),
+    (models.UserSkill.__table__, "ix_user_skills_user_skill", ("user_id", "skill_id")),
+]
+
+def migrate():
+    print("Migrating composite unique indexes...")
+    for table, index_name, columns in UNIQUE_INDEXES:
+        keys = ", ".join(columns)
+        with engine.begin() as conn:
+            # Keep the newest row of any duplicates left behind by the old SELECT-then-INSERT paths
+            removed = conn.execute(text(
+                f"DELETE FROM {table.name} WHERE id NOT IN "
+                f"(SELECT MAX(id) FROM {table.name} GROUP BY {keys})"
+            )).rowcount
+            if removed:
+                print(f"Removed {removed} duplicate rows from {table.name}.")
+        index = next(i for i in table.indexes if i.name == index_name)
+        index.create(bind=engine, checkfirst=True)
+        print(f"Ensured {index_name} on {table.name}({keys}).")
+    print("Migration complete.")
+
+if __name__ == "__main__":
+    migrate()
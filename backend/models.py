@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text, Enum, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -42,6 +42,10 @@ class Branch(Base):
 
 class Subject(Base):
     __tablename__ = "subjects"
+    __table_args__ = (
+        # Catalog filters: branch_id (+ year), resolved to subject ids in id order
+        Index("ix_subjects_branch_year_id", "branch_id", "year", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     code = Column(String, index=True) # e.g. "CS201"
@@ -55,6 +59,10 @@ class Subject(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # Keyset pages of a subject's courses: subject_id = ? AND id > cursor
+        Index("ix_courses_subject_id_id", "subject_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -100,6 +108,10 @@ class Lesson(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        # One row per (user, lesson); also the conflict target for progress upserts
+        Index("ix_user_progress_user_lesson", "user_id", "lesson_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -149,9 +161,13 @@ class Skill(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     category = Column(String) # Frontend, Backend, Security
+    aliases = Column(String, nullable=True) # comma separated, e.g. "py, python3"
     
 class UserSkill(Base):
     __tablename__ = "user_skills"
+    __table_args__ = (
+        Index("ix_user_skills_user_skill", "user_id", "skill_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -165,14 +181,51 @@ class UserSkill(Base):
 
 class UserCourse(Base):
     __tablename__ = "user_courses"
+    __table_args__ = (
+        Index("ix_user_courses_user_course", "user_id", "course_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     course_id = Column(Integer, ForeignKey("courses.id"))
     enrolled_at = Column(DateTime(timezone=True), server_default=func.now())
     progress_percent = Column(Integer, default=0)
+    # Maintained on every progress write and lesson add/remove (see progress.py)
+    completed_lessons = Column(Integer, default=0)
+    total_lessons = Column(Integer, default=0)
 
     user = relationship("User", back_populates="courses")
     course = relationship("Course")
 
 
+class ResumeAnalysis(Base):
+    # Cached resume analysis results (see resume_cache.py)
+    __tablename__ = "resume_analyses"
+    __table_args__ = (
+        Index("ix_resume_analyses_hash_version", "content_hash", "catalog_version", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String) # sha256 of the uploaded file
+    catalog_version = Column(String) # skill_catalog version the analysis ran against
+    result = Column(Text) # JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class JobPosting(Base):
+    # Job corpus behind resume recommendations (see job_index.py, load_job_postings.py)
+    __tablename__ = "job_postings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String)
+    company = Column(String)
+    location = Column(String)
+    salary_range = Column(String)
+    description = Column(Text) # matched against the skill catalog
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# The Lesson hooks that keep enrollment lesson totals in step live in progress.py;
+# importing it here registers them for every writer (API, seed and migrate scripts,
+# ad-hoc sessions), not only the ones that happen to import progress themselves.
+import progress
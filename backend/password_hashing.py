@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+# Password hashing off the request path.
+# pbkdf2 holds the GIL for its whole run, so hashing in anyio's threadpool lets a
+# burst of logins starve every other sync endpoint. Hashes run in their own small
+# process pool instead, and once PASSWORD_MAX_PENDING hashes are queued new ones
+# fail fast (HashingBusy -> 503) rather than piling up behind the burst.
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(PASSWORD_WORKERS * 16)))
+# Raising the rounds makes older hashes "need update"; they are rehashed on next login
+PASSWORD_HASH_ROUNDS = os.getenv("PASSWORD_HASH_ROUNDS")
+
+_settings = {}
+if PASSWORD_HASH_ROUNDS:
+    _settings = {
+        "pbkdf2_sha256__default_rounds": int(PASSWORD_HASH_ROUNDS),
+        "pbkdf2_sha256__min_rounds": int(PASSWORD_HASH_ROUNDS),
+    }
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto", **_settings)
+
+
+# Worker side (module level so the spawned processes can unpickle them)
+def _hash(password):
+    return pwd_context.hash(password)
+
+def _verify_and_update(password, hashed_password):
+    # (valid, new hash if the stored one uses outdated parameters else None)
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingPool:
+    def __init__(self, workers=PASSWORD_WORKERS, max_pending=PASSWORD_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HashingBusy()
+            self.pending += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the worker is done, not when the caller stops waiting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    async def hash(self, password):
+        return await self.run(_hash, password)
+
+    async def verify_and_update(self, password, hashed_password):
+        return await self.run(_verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_pool = HashingPool()
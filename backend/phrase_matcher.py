@@ -0,0 +1,73 @@
+import re
+from collections import deque
+
+# Multi-phrase matcher over word tokens (Aho-Corasick with tokens as the alphabet).
+# Matching is a single pass over the text's tokens regardless of how many phrases
+# are loaded, and phrases only match whole words ("hi" never matches inside "this").
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#]+|(?:[.'][a-z0-9]+)*)")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class PhraseMatcher:
+    def __init__(self):
+        self._phrases = [] # (tokens, payload)
+        self._compiled = False
+
+    def add(self, phrase, payload):
+        tokens = tokenize(phrase) if isinstance(phrase, str) else list(phrase)
+        if tokens:
+            self._phrases.append((tuple(tokens), payload))
+            self._compiled = False
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def compile(self):
+        goto = [{}]
+        outputs = [[]]
+        for tokens, payload in self._phrases:
+            node = 0
+            for token in tokens:
+                nxt = goto[node].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][token] = nxt
+                    goto.append({})
+                    outputs.append([])
+                node = nxt
+            outputs[node].append((len(tokens), payload))
+
+        # Failure links, breadth first; outputs inherit the ones of their fallback node
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                queue.append(child)
+                fallback = fail[node]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(token, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._compiled = True
+
+    def finditer(self, text):
+        # Yields (start_token, end_token, payload) for every phrase occurrence
+        if not self._compiled:
+            self.compile()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for position, token in enumerate(tokenize(text) if isinstance(text, str) else text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for length, payload in outputs[node]:
+                yield position - length + 1, position + 1, payload
@@ -0,0 +1,218 @@
+from sqlalchemy import and_, bindparam, case, event, func, inspect, select, update
+from sqlalchemy.orm import object_session
+
+from database import upsert_insert
+import dashboard
+import models
+
+# Progress writes shared by the single, batch and buffered paths.
+# Every write also recounts the UserCourse completion counters, so reads never
+# have to join UserProgress -> Lesson -> Module to work out a percentage.
+
+MAX_BATCH_SIZE = 1000
+
+user_courses = models.UserCourse.__table__
+
+def progress_upsert():
+    # INSERT ... ON CONFLICT (user_id, lesson_id) DO UPDATE; a missing score keeps the stored one
+    stmt = upsert_insert(models.UserProgress)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "lesson_id"],
+        set_={
+            "completed": stmt.excluded.completed,
+            "score": func.coalesce(stmt.excluded.score, models.UserProgress.score),
+            "last_accessed": func.now(),
+        },
+    )
+
+def percent_expr(completed, total):
+    # Whole percent, rounded down; plain / is true division in SQLAlchemy 2.x
+    return case((total > 0, completed * 100 // total), else_=0)
+
+def counter_values():
+    # total/completed/percent of the user_courses row being updated, counted from scratch
+    lesson_course = select(models.Lesson.id.label("lesson_id"), models.Module.course_id).join(
+        models.Module, models.Module.id == models.Lesson.module_id
+    ).subquery()
+    total = select(func.count()).where(
+        lesson_course.c.course_id == user_courses.c.course_id
+    ).scalar_subquery()
+    completed = select(func.count(models.UserProgress.id)).join(
+        lesson_course, lesson_course.c.lesson_id == models.UserProgress.lesson_id
+    ).where(
+        lesson_course.c.course_id == user_courses.c.course_id,
+        models.UserProgress.user_id == user_courses.c.user_id,
+        models.UserProgress.completed.is_(True),
+    ).scalar_subquery()
+    return {
+        "total_lessons": total,
+        "completed_lessons": completed,
+        "progress_percent": percent_expr(completed, total),
+    }
+
+# Recount one enrollment (executemany over the (user, course) pairs a write touched)
+counter_recount = update(user_courses).where(
+    user_courses.c.user_id == bindparam("b_user_id"),
+    user_courses.c.course_id == bindparam("b_course_id"),
+).values(**counter_values())
+
+def progress_context(db, user_ids, lesson_ids):
+    # One query: the course of each lesson plus the stored state of the (user, lesson) pairs.
+    # Lessons missing from the returned course map don't exist.
+    stmt = (
+        select(
+            models.Lesson.id,
+            models.Module.course_id,
+            models.UserProgress.user_id,
+            models.UserProgress.completed,
+            models.UserProgress.score,
+        )
+        .outerjoin(models.Module, models.Module.id == models.Lesson.module_id)
+        .outerjoin(models.UserProgress, and_(
+            models.UserProgress.lesson_id == models.Lesson.id,
+            models.UserProgress.user_id.in_(user_ids),
+        ))
+        .where(models.Lesson.id.in_(lesson_ids))
+    )
+    courses = {}
+    stored = {}
+    for lesson_id, course_id, user_id, completed, score in db.execute(stmt):
+        courses[lesson_id] = course_id
+        if user_id is not None:
+            stored[(user_id, lesson_id)] = (bool(completed), score)
+    return courses, stored
+
+def write_progress(db, rows, courses, stored):
+    # rows: one dict per (user_id, lesson_id) with completed/score, lessons already validated.
+    # Writes them with one executemany upsert and recounts the touched enrollments.
+    # Returns the rows as stored (score falls back to the old one).
+    if not rows:
+        return []
+    written = []
+    for row in rows:
+        _, old_score = stored.get((row["user_id"], row["lesson_id"]), (False, None))
+        written.append({**row, "score": row["score"] if row["score"] is not None else old_score})
+
+    db.execute(progress_upsert(), rows)
+
+    # The counters are recounted inside this transaction rather than shifted by deltas
+    # worked out from `stored`: that snapshot is read before the write lock is taken,
+    # so concurrent writers of the same lesson would each count the completion.
+    enrollments = {(row["user_id"], courses.get(row["lesson_id"])) for row in rows}
+    db.execute(counter_recount, [
+        {"b_user_id": user_id, "b_course_id": course_id}
+        for user_id, course_id in enrollments
+        if course_id is not None
+    ])
+    return written
+
+def apply_progress_batch(db, user_id, updates):
+    # Validates lessons, coalesces repeated lessons (last write wins, like applying them
+    # one by one) and writes everything in one go. The caller owns the transaction.
+    courses, stored = progress_context(db, [user_id], {u.lesson_id for u in updates})
+
+    rows = {}
+    results = []
+    for update in updates:
+        if update.lesson_id not in courses:
+            results.append({"lesson_id": update.lesson_id, "status": "error", "detail": "Lesson not found"})
+            continue
+        previous = rows.get(update.lesson_id)
+        score = update.score
+        if score is None and previous is not None:
+            score = previous["score"]
+        rows[update.lesson_id] = {
+            "user_id": user_id,
+            "lesson_id": update.lesson_id,
+            "completed": update.completed,
+            "score": score,
+        }
+        results.append({"lesson_id": update.lesson_id, "status": "ok", "detail": None})
+
+    if rows:
+        write_progress(db, list(rows.values()), courses, stored)
+    return results
+
+def enrollment_values(user_id, course_id):
+    # Counters for a new enrollment; progress made before enrolling still counts
+    course_lessons = (
+        select(models.Lesson.id)
+        .join(models.Module, models.Module.id == models.Lesson.module_id)
+        .where(models.Module.course_id == course_id)
+    )
+    total = select(func.count()).select_from(course_lessons.subquery()).scalar_subquery()
+    completed = select(func.count(models.UserProgress.id)).where(
+        models.UserProgress.user_id == user_id,
+        models.UserProgress.completed.is_(True),
+        models.UserProgress.lesson_id.in_(course_lessons),
+    ).scalar_subquery()
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "total_lessons": total,
+        "completed_lessons": completed,
+        "progress_percent": percent_expr(completed, total),
+    }
+
+def recount_enrollments(connection, course_ids=None):
+    # Full recount of the counters, for backfills and structural changes.
+    # Returns the ids of the users whose enrollments were recounted.
+    stmt = update(user_courses).values(**counter_values())
+    if course_ids is not None:
+        stmt = stmt.where(user_courses.c.course_id.in_(course_ids))
+    return connection.execute(stmt.returning(user_courses.c.user_id)).scalars().all()
+
+
+# Lessons are added and removed by seed/admin scripts, so keep the totals in step
+# through ORM hooks rather than at each call site. The UPDATEs return the enrolled
+# users, whose cached dashboards are dropped when the change commits.
+def _lesson_course(lesson):
+    return select(models.Module.course_id).where(models.Module.id == lesson.module_id).scalar_subquery()
+
+@event.listens_for(models.Lesson, "after_insert")
+def _lesson_added(mapper, connection, target):
+    users = connection.execute(
+        update(user_courses)
+        .where(user_courses.c.course_id == _lesson_course(target))
+        .values(
+            total_lessons=user_courses.c.total_lessons + 1,
+            progress_percent=user_courses.c.completed_lessons * 100 // (user_courses.c.total_lessons + 1),
+        )
+        .returning(user_courses.c.user_id)
+    ).scalars().all()
+    dashboard.invalidate_dashboard_on_commit(object_session(target), users)
+
+@event.listens_for(models.Lesson, "after_delete")
+def _lesson_removed(mapper, connection, target):
+    was_completed = select(func.count(models.UserProgress.id)).where(
+        models.UserProgress.user_id == user_courses.c.user_id,
+        models.UserProgress.lesson_id == target.id,
+        models.UserProgress.completed.is_(True),
+    ).scalar_subquery()
+    remaining = user_courses.c.total_lessons - 1
+    users = connection.execute(
+        update(user_courses)
+        .where(user_courses.c.course_id == _lesson_course(target))
+        .values(
+            total_lessons=remaining,
+            completed_lessons=user_courses.c.completed_lessons - was_completed,
+            progress_percent=percent_expr(user_courses.c.completed_lessons - was_completed, remaining),
+        )
+        .returning(user_courses.c.user_id)
+    ).scalars().all()
+    dashboard.invalidate_dashboard_on_commit(object_session(target), users)
+
+# Load the old module_id when it is reassigned on an expired instance, otherwise the
+# history below only knows the new course and the old one is never recounted
+@event.listens_for(models.Lesson.module_id, "set", active_history=True)
+def _lesson_module_set(target, value, oldvalue, initiator):
+    return value
+
+@event.listens_for(models.Lesson, "after_update")
+def _lesson_moved(mapper, connection, target):
+    changes = inspect(target).attrs.module_id.history
+    if not changes.has_changes():
+        return
+    module_ids = [m for m in (changes.deleted or []) + (changes.added or []) if m is not None]
+    course_ids = select(models.Module.course_id).where(models.Module.id.in_(module_ids))
+    dashboard.invalidate_dashboard_on_commit(object_session(target), recount_enrollments(connection, course_ids))
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime
+
+from anyio import to_thread
+
+from dashboard import invalidate_dashboard
+from database import SessionLocal
+from progress import progress_context, write_progress
+import models
+
+# Write-behind buffer for progress heartbeats.
+# Video and simulation lessons report position/score every few seconds. Those
+# non-completing updates only keep the latest state per (user, lesson) in memory
+# and are written in one batched upsert when PROGRESS_FLUSH_INTERVAL seconds
+# pass or PROGRESS_FLUSH_MAX_PENDING keys are waiting, and on shutdown.
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "5"))
+PROGRESS_FLUSH_MAX_PENDING = int(os.getenv("PROGRESS_FLUSH_MAX_PENDING", "500"))
+
+HEARTBEAT_LESSON_TYPES = {models.LessonType.VIDEO.value, models.LessonType.SIMULATION.value}
+
+logger = logging.getLogger("skilltree.progress_buffer")
+
+
+class ProgressBuffer:
+    def __init__(self, session_factory=SessionLocal, max_pending=PROGRESS_FLUSH_MAX_PENDING):
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self._pending = {} # (user_id, lesson_id) -> row
+        self._accessed = {} # (user_id, lesson_id) -> time of the latest heartbeat
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._lesson_types = {}
+
+    def lesson_type(self, db, lesson_id):
+        # Lesson types never change through the API, so cache them for the process
+        if lesson_id not in self._lesson_types:
+            self._lesson_types[lesson_id] = db.query(models.Lesson.content_type).filter(
+                models.Lesson.id == lesson_id
+            ).scalar()
+        return self._lesson_types[lesson_id]
+
+    def is_heartbeat(self, db, update):
+        return not update.completed and self.lesson_type(db, update.lesson_id) in HEARTBEAT_LESSON_TYPES
+
+    def add(self, user_id, update):
+        # Returns the merged pending row; flushes inline once the size threshold is hit
+        key = (user_id, update.lesson_id)
+        with self._lock:
+            previous = self._pending.get(key)
+            score = update.score
+            if score is None and previous is not None:
+                score = previous["score"]
+            row = {"user_id": user_id, "lesson_id": update.lesson_id, "completed": update.completed, "score": score}
+            self._pending[key] = row
+            self._accessed[key] = datetime.utcnow()
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+        return row
+
+    def take(self, user_id, lesson_ids):
+        # Removes and returns pending rows that a direct write is about to supersede
+        with self._lock:
+            keys = [(user_id, lesson_id) for lesson_id in lesson_ids if (user_id, lesson_id) in self._pending]
+            for key in keys:
+                self._accessed.pop(key, None)
+            return [self._pending.pop(key) for key in keys]
+
+    def pending_for(self, user_id):
+        # lesson_id -> (row, last heartbeat time) for one user's unflushed heartbeats,
+        # so reads can lay them over stored progress instead of flushing
+        with self._lock:
+            return {
+                key[1]: (row, self._accessed[key])
+                for key, row in self._pending.items()
+                if key[0] == user_id
+            }
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def flush(self):
+        # Serialize flushes so an older batch never lands after a newer one
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending.values())
+                self._pending.clear()
+                self._accessed.clear()
+            if not rows:
+                return 0
+
+            db = self.session_factory()
+            try:
+                courses, stored = progress_context(
+                    db, {row["user_id"] for row in rows}, {row["lesson_id"] for row in rows}
+                )
+                write_progress(db, [row for row in rows if row["lesson_id"] in courses], courses, stored)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Progress flush failed, re-queueing %d rows", len(rows))
+                with self._lock:
+                    for row in rows:
+                        # Keep anything newer that arrived while we were writing
+                        key = (row["user_id"], row["lesson_id"])
+                        if key not in self._pending:
+                            self._pending[key] = row
+                            self._accessed[key] = datetime.utcnow()
+                return 0
+            finally:
+                db.close()
+            invalidate_dashboard(*{row["user_id"] for row in rows})
+            return len(rows)
+
+    async def run(self, interval=PROGRESS_FLUSH_INTERVAL):
+        # Background flush loop, started from the app lifespan
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await to_thread.run_sync(self.flush)
+            except Exception:
+                logger.exception("Progress flush loop error")
+
+
+progress_buffer = ProgressBuffer()
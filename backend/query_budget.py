@@ -0,0 +1,68 @@
+import contextvars
+import logging
+import os
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# Per-request SQL statement counting.
+# QUERY_BUDGET_MODE=off (default) | warn | enforce
+# In "enforce" mode a route that runs more statements than it declared via
+# statement_budget() answers 500, so the live test scripts catch N+1 regressions.
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+
+logger = logging.getLogger("skilltree.query_budget")
+
+_current = contextvars.ContextVar("sql_statement_counter", default=None)
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self.budget = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def install(*engines):
+    for db_engine in engines:
+        # AsyncEngine events are registered on its sync core
+        db_engine = getattr(db_engine, "sync_engine", db_engine)
+        event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def statement_budget(limit: int):
+    # Route dependency declaring the max statements the endpoint may run
+    async def declare_budget():
+        counter = _current.get()
+        if counter is not None:
+            counter.budget = limit
+    return declare_budget
+
+
+class QueryBudgetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        counter = StatementCounter()
+        token = _current.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+
+        response.headers["X-SQL-Statements"] = str(counter.count)
+        if counter.budget is not None and counter.count > counter.budget:
+            message = f"{request.method} {request.url.path} ran {counter.count} SQL statements (budget {counter.budget})"
+            if QUERY_BUDGET_MODE == "enforce":
+                return JSONResponse(
+                    status_code=500,
+                    content={"detail": f"SQL statement budget exceeded: {message}"},
+                    headers={"X-SQL-Statements": str(counter.count)},
+                )
+            logger.warning(message)
+        return response
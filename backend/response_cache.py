@@ -0,0 +1,147 @@
+import os
+import re
+import secrets
+import threading
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+import models
+
+# HTTP caching for the read-mostly catalog endpoints.
+# Each namespace has a version that committed ORM writes to its models bump
+# (create_course, create_skill, anything else going through a Session). ETags are
+# the boot nonce plus that version, so a conditional GET is answered 304 without
+# touching the route, and full responses are replayed from memory, skipping the DB
+# and serialization.
+# Versions are per process; RESPONSE_CACHE_TTL bounds staleness across workers.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0")) # browsers revalidate every load by default
+
+CACHED_ROUTES = [
+    (re.compile(r"^/api/courses/$"), "courses"),
+    (re.compile(r"^/api/courses/\d+$"), "courses"),
+    (re.compile(r"^/api/courses/meta/branches$"), "courses"),
+    (re.compile(r"^/api/courses/meta/facets$"), "courses"),
+    (re.compile(r"^/api/search/$"), "courses"),
+    (re.compile(r"^/api/skills/$"), "skills"),
+]
+NAMESPACE_MODELS = {
+    "courses": (models.Branch, models.Subject, models.Course, models.Module, models.Lesson),
+    "skills": (models.Skill,),
+}
+# Response headers replayed from the cache (the route's own, e.g. pagination links)
+STORED_HEADERS = {b"content-type", b"x-next-cursor", b"link"}
+
+BOOT_NONCE = secrets.token_hex(4)
+
+response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+_versions = {namespace: 0 for namespace in NAMESPACE_MODELS}
+_lock = threading.Lock()
+
+
+def invalidate(namespace):
+    with _lock:
+        _versions[namespace] += 1
+    response_cache.pop_where(lambda key, entry: key[0] == namespace)
+
+
+def etag(namespace, version):
+    return f'W/"{BOOT_NONCE}-{namespace}{version}"'
+
+
+def _namespace_for(path):
+    for pattern, namespace in CACHED_ROUTES:
+        if pattern.match(path):
+            return namespace
+    return None
+
+
+def _etag_matches(header, current):
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or current in tags or current[2:] in tags # weak comparison
+
+
+class ResponseCacheMiddleware:
+    # Pure ASGI so cached bodies go out as-is; add it innermost (before CORS)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        namespace = _namespace_for(scope["path"])
+        if namespace is None:
+            return await self.app(scope, receive, send)
+
+        version = _versions[namespace]
+        tag = etag(namespace, version)
+        cache_headers = [
+            (b"etag", tag.encode()),
+            (b"cache-control", f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate".encode()),
+        ]
+        request_headers = dict(scope["headers"])
+        key = (namespace, scope["path"], scope["query_string"])
+
+        if _etag_matches(request_headers.get(b"if-none-match", b"").decode("latin-1"), tag):
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        entry = response_cache.get(key)
+        if entry is not None:
+            headers, body = entry
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": headers + cache_headers + [(b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+            return
+
+        # Miss: run the route, tag the response and keep a copy if nothing changed meanwhile
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                if message["status"] == 200:
+                    message = {**message, "headers": list(message.get("headers", [])) + cache_headers}
+            elif message["type"] == "http.response.body" and start.get("status") == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body") and scope["method"] == "GET" and _versions[namespace] == version:
+                    headers = [(k, v) for k, v in start.get("headers", []) if k.lower() in STORED_HEADERS]
+                    response_cache.set(key, (headers, b"".join(chunks)))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+
+# Versions move when a write commits, not at flush: a read racing the transaction
+# would otherwise cache pre-commit data under the new version.
+MODEL_NAMESPACES = {model: namespace for namespace, group in NAMESPACE_MODELS.items() for model in group}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        namespace = MODEL_NAMESPACES.get(type(obj))
+        if namespace is not None:
+            session.info.setdefault("response_cache_namespaces", set()).add(namespace)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for namespace in session.info.pop("response_cache_namespaces", ()):
+        invalidate(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("response_cache_namespaces", None)
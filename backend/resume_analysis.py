@@ -0,0 +1,93 @@
+import io
+import re
+import zipfile
+
+import skill_index
+
+# CPU-bound resume work. Everything here runs inside the resume process pool
+# (see resume_jobs.py), so it must stay importable on its own: no DB, no app state.
+
+DOCX_TEXT_RE = re.compile(rb"<w:t[^>]*>([^<]*)</w:t>")
+DOCX_BREAK_RE = re.compile(rb"</w:p>|<w:br/>|<w:tab/>")
+
+
+def _docx_text(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml")
+    xml = DOCX_BREAK_RE.sub(b"<w:t> </w:t>", xml)
+    return b"".join(DOCX_TEXT_RE.findall(xml)).decode("utf-8", errors="ignore")
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        # Without pypdf, fall back to the literal strings in the content streams
+        return " ".join(s.decode("latin-1") for s in re.findall(rb"\(([^()]*)\)\s*Tj", data))
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(path, filename=""):
+    with open(path, "rb") as f:
+        data = f.read()
+    name = (filename or "").lower()
+    if name.endswith(".docx") or data[:2] == b"PK":
+        try:
+            return _docx_text(data)
+        except (zipfile.BadZipFile, KeyError):
+            pass
+    if name.endswith(".pdf") or data[:5] == b"%PDF-":
+        return _pdf_text(data)
+    return data.decode("utf-8", errors="ignore")
+
+
+# Target role per skill category; categories without an entry get "<category> Specialist"
+ROLE_BY_CATEGORY = {
+    "Cyber Security": "Junior Security Analyst",
+    "Backend": "Backend Developer",
+    "Frontend": "Frontend Developer",
+    "CSE": "Software Engineer",
+}
+MAX_MISSING_SKILLS = 5
+
+def score_skills(index, found):
+    # Best role = the category with the most skills found (coverage breaks ties).
+    # Score weighs coverage of that role's skills against coverage of the whole catalog.
+    if not index.skills:
+        return 0, "Generalist", []
+
+    def coverage(category):
+        skill_ids = index.by_category[category]
+        hits = sum(1 for skill_id in skill_ids if skill_id in found)
+        return hits, hits / len(skill_ids)
+
+    category = max(sorted(index.by_category), key=coverage)
+    hits, role_coverage = coverage(category)
+    overall = len(found) / len(index.skills)
+    score = round(100 * (0.7 * role_coverage + 0.3 * overall))
+    missing = [index.skills[skill_id][1] for skill_id in index.by_category[category] if skill_id not in found]
+    role = ROLE_BY_CATEGORY.get(category, f"{category} Specialist")
+    return score, role, missing[:MAX_MISSING_SKILLS]
+
+
+def analyze_document(path, filename="", catalog=None):
+    # catalog: (version, skills) from skill_catalog.CatalogSnapshot
+    text = extract_text(path, filename)
+    version, skills = catalog or ("", ())
+    index = skill_index.index_for(version, skills)
+
+    found = index.extract(text)
+    score, role, missing = score_skills(index, found)
+    if missing:
+        recommendation = f"To grow as a {role}, focus next on: {', '.join(missing)}."
+    else:
+        recommendation = f"Your resume covers every {role} skill we track. Keep building on it with advanced courses."
+
+    return {
+        "score": score,
+        "match_role": role,
+        "skills_found": [index.skills[skill_id][1] for skill_id in sorted(found, key=lambda s: (-found[s], s))],
+        "missing_skills": missing,
+        "recommendation": recommendation,
+    }
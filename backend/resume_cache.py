@@ -0,0 +1,54 @@
+import json
+import logging
+
+from sqlalchemy import select
+
+from cache import TTLCache
+from database import SessionLocal, upsert_insert
+import models
+
+# Persistent resume analysis cache keyed by (content hash, skill catalog version).
+# Students re-upload the same file many times; a repeat only costs the upload
+# itself plus one indexed lookup (or none if it is still in the in-memory front).
+
+logger = logging.getLogger("skilltree.resume_cache")
+
+_recent = TTLCache(maxsize=1024, ttl=3600)
+
+
+async def lookup(db, content_hash, catalog_version):
+    key = (content_hash, catalog_version)
+    result = _recent.get(key)
+    if result is not None:
+        return result
+    stored = (await db.execute(
+        select(models.ResumeAnalysis.result).where(
+            models.ResumeAnalysis.content_hash == content_hash,
+            models.ResumeAnalysis.catalog_version == catalog_version,
+        )
+    )).scalar()
+    if stored is None:
+        return None
+    result = json.loads(stored)
+    _recent.set(key, result)
+    return result
+
+
+def store(content_hash, catalog_version, result):
+    # Called from the job pool's callback thread, hence the sync session
+    _recent.set((content_hash, catalog_version), result)
+    db = SessionLocal()
+    try:
+        db.execute(
+            upsert_insert(models.ResumeAnalysis).values(
+                content_hash=content_hash,
+                catalog_version=catalog_version,
+                result=json.dumps(result),
+            ).on_conflict_do_nothing(index_elements=["content_hash", "catalog_version"])
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Could not store resume analysis %s", content_hash)
+    finally:
+        db.close()
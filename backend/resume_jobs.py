@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import TTLCache
+import resume_analysis
+import resume_cache
+
+# Resume analysis jobs.
+# Uploads are handed to a process pool sized to the machine's cores, so text
+# extraction and scoring never run on the event loop or in anyio's threadpool.
+# Job state is kept in a bounded store and can be polled until it expires.
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", str(os.cpu_count() or 1)))
+RESUME_JOB_RETENTION = int(os.getenv("RESUME_JOB_RETENTION", "10000"))
+RESUME_JOB_TTL = float(os.getenv("RESUME_JOB_TTL", "3600"))
+
+logger = logging.getLogger("skilltree.resume_jobs")
+
+
+class JobManager:
+    def __init__(self, workers=RESUME_WORKERS):
+        self.workers = workers
+        self.jobs = TTLCache(maxsize=RESUME_JOB_RETENTION, ttl=RESUME_JOB_TTL)
+        self._futures = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process has threads and open DB connections we don't want forked
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _new_job(self, filename, status="pending", result=None):
+        job_id = uuid.uuid4().hex
+        job = {"job_id": job_id, "status": status, "filename": filename, "created_at": time.time(), "result": result, "error": None}
+        self.jobs.set(job_id, job)
+        return job
+
+    def completed(self, filename, result):
+        # Job record for a result served from the analysis cache
+        return dict(self._new_job(filename, status="completed", result=result))
+
+    def submit(self, path, filename, catalog=None, cache_key=None, cleanup=True):
+        # catalog: (version, skills) the worker compiles its extraction index from;
+        # cache_key: (content hash, catalog version) to store the result under
+        job = self._new_job(filename)
+        job_id = job["job_id"]
+
+        future = self.executor.submit(resume_analysis.analyze_document, path, filename, catalog)
+        self._futures[job_id] = future
+
+        def finished(done):
+            self._futures.pop(job_id, None)
+            if cleanup:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if done.cancelled():
+                job.update(status="failed", error="Cancelled", finished_at=time.time())
+                return
+            error = done.exception()
+            if error is not None:
+                logger.error("Resume job %s failed: %s", job_id, error)
+                job.update(status="failed", error=str(error), finished_at=time.time())
+                return
+            if cache_key is not None:
+                resume_cache.store(*cache_key, done.result())
+            job.update(status="completed", result=done.result(), finished_at=time.time())
+
+        future.add_done_callback(finished)
+        return dict(job)
+
+    def get(self, job_id):
+        # Copy: the pool's callback thread updates the stored dict in place
+        job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def wait(self, job_id):
+        future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception:
+                pass
+        return self.get(job_id)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+job_manager = JobManager()
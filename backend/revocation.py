@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+# Revoked token ids (jti) for logout and refresh-token rotation.
+# Lookups never touch the DB: a bloom filter answers "definitely not revoked" for
+# almost every token, and only its rare hits consult the exact jti -> exp map.
+# Revocations are appended to REVOKED_TOKENS_FILE and reloaded (minus expired
+# entries) at startup. Each process keeps its own copy.
+REVOKED_TOKENS_FILE = os.getenv("REVOKED_TOKENS_FILE", "revoked_tokens.log")
+REVOCATION_CAPACITY = int(os.getenv("REVOCATION_CAPACITY", "100000"))
+REVOCATION_FALSE_POSITIVE_RATE = 0.001
+
+logger = logging.getLogger("skilltree.revocation")
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, path=REVOKED_TOKENS_FILE, capacity=REVOCATION_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._reset({})
+
+    def _reset(self, revoked):
+        bloom = BloomFilter(max(self.capacity, len(revoked) * 2), REVOCATION_FALSE_POSITIVE_RATE)
+        for jti in revoked:
+            bloom.add(jti)
+        self._bloom, self._revoked = bloom, revoked
+
+    def is_revoked(self, jti):
+        if not jti or jti not in self._bloom:
+            return False
+        return jti in self._revoked
+
+    def revoke(self, jti, expires_at):
+        # expires_at: the token's exp (unix seconds); the entry can be dropped after that
+        if not jti or expires_at <= time.time():
+            return
+        with self._lock:
+            if jti in self._revoked:
+                return
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+            if len(self._revoked) > self.capacity:
+                self._reset(self._unexpired())
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(f"{jti} {int(expires_at)}\n")
+            except OSError:
+                logger.exception("Could not persist revocation of %s", jti)
+
+    def _unexpired(self):
+        now = time.time()
+        return {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+    def load(self):
+        # Startup: read the log, drop expired tokens and rewrite it compacted
+        revoked = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[1].isdigit():
+                        revoked[parts[0]] = int(parts[1])
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._revoked = revoked
+            revoked = self._unexpired()
+            self._reset(revoked)
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(f"{jti} {exp}\n" for jti, exp in revoked.items())
+                os.replace(tmp_path, self.path)
+            except OSError:
+                logger.exception("Could not compact %s", self.path)
+        return len(revoked)
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+revocations = RevocationList()
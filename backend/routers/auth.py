@@ -1,13 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from pydantic import BaseModel
+from dataclasses import dataclass
 from datetime import timedelta, datetime
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+import os
+import time
+import uuid
 
-from database import get_db
+from cache import TTLCache
+from database import get_async_db
+from password_hashing import HashingBusy, hashing_pool, pwd_context
+from revocation import revocations
 import models
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -15,11 +23,22 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 # Security Config
 SECRET_KEY = "supersecretkey" # Change in production
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Access tokens stay short; clients renew them with the refresh token (POST /refresh)
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# Verified tokens -> (principal, jti), so repeat requests skip both the JWT check and the
+# user lookup. Entries never outlive the token's exp, and are dropped when the user's
+# profile, role or active flag changes through the ORM (see _user_changed below).
+# The cache is per process: changes made elsewhere show up within AUTH_CACHE_TTL.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+PRINCIPAL_FIELDS = ("username", "email", "role", "is_active", "hashed_password", "bio", "avatar_style")
+
+auth_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
 # Pydantic Models
 class UserCreate(BaseModel):
     username: str
@@ -29,6 +48,22 @@ class UserCreate(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+@dataclass(frozen=True)
+class Principal:
+    # What authenticated endpoints get instead of the User row
+    id: int
+    username: str
+    email: str
+    role: str
+    is_active: bool
 
 # Helpers
 def verify_password(plain_password, hashed_password):
@@ -43,58 +78,173 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; "type" keeps refresh tokens off API routes
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    to_encode.setdefault("type", "access")
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def issue_tokens(username):
+    return {
+        "access_token": create_access_token(
+            data={"sub": username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "refresh_token": create_access_token(
+            data={"sub": username, "type": "refresh"}, expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        ),
+        "token_type": "bearer",
+    }
+
+def decode_token(token, token_type="access"):
+    # Verified, unrevoked claims of the given token type, else 401. No DB access.
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise credentials_exception
+    if revocations.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    return payload
+
+def revoke_token(payload):
+    revocations.revoke(payload.get("jti"), payload.get("exp", 0))
+
+async def pooled(hashing):
+    # Hashes run in the dedicated pool (password_hashing.py); a full queue fails fast
+    try:
+        return await hashing
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins right now, please retry",
+            headers={"Retry-After": "1"},
+        )
+
 # Endpoints
 @router.post("/register", response_model=Token)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(models.User.id).where(models.User.email == user.email))).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await pooled(hashing_pool.hash(user.password))
     db_user = models.User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
-    access_token = create_access_token(data={"sub": db_user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return issue_tokens(db_user.username)
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(models.User).where(models.User.username == form_data.username))).scalar()
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await pooled(hashing_pool.verify_and_update(form_data.password, user.hashed_password))
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored hash predates the current hashing parameters: upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
     
-    access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return issue_tokens(user.username)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    # New access token without the password hash. Refresh tokens rotate: the one
+    # presented is revoked and a new pair is issued.
+    payload = decode_token(request.refresh_token, token_type="refresh")
+    active = (await db.execute(
+        select(models.User.is_active).where(models.User.username == payload["sub"])
+    )).first()
+    if active is None or active.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    revoke_token(payload)
+    return issue_tokens(payload["sub"])
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: Optional[LogoutRequest] = None, token: str = Depends(oauth2_scheme)):
+    # Revokes the bearer token and, if given, the session's refresh token
+    revoke_token(decode_token(token))
+    auth_cache.pop(token)
+    if request is not None and request.refresh_token:
+        try:
+            revoke_token(decode_token(request.refresh_token, token_type="refresh"))
+        except HTTPException:
+            pass # already expired or revoked
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    cached = auth_cache.get(token)
+    if cached is not None and not revocations.is_revoked(cached[1]):
+        return cached[0]
+
+    payload = decode_token(token)
+    username: str = payload["sub"]
+    user = (await db.execute(
+        select(models.User.id, models.User.username, models.User.email, models.User.role, models.User.is_active)
+        .where(models.User.username == username)
+    )).first()
+    if user is None or user.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = Principal(id=user.id, username=user.username, email=user.email, role=user.role, is_active=bool(user.is_active))
+    ttl = AUTH_CACHE_TTL
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        auth_cache.set(token, (principal, payload.get("jti")), ttl=ttl)
+    return principal
+
+def invalidate_principals(*user_ids):
+    auth_cache.pop_where(lambda token, cached: cached[0].id in user_ids)
+
+# The ORM hooks fire at flush, before the write commits: a token checked in between
+# would cache the old row again. Changed users are collected on the session and
+# dropped once more after commit (a rollback only costs a cache reload).
+def _invalidate_on_commit(target):
+    invalidate_principals(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principal_users", set()).add(target.id)
+
+@event.listens_for(models.User, "after_update")
+def _user_changed(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS):
+        _invalidate_on_commit(target)
+
+@event.listens_for(models.User, "after_delete")
+def _user_removed(mapper, connection, target):
+    _invalidate_on_commit(target)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    user_ids = session.info.pop("principal_users", None)
+    if user_ids:
+        invalidate_principals(*user_ids)
 
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("principal_users", None)
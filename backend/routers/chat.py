@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional
+from collections import deque
+import asyncio
+import json
+import os
+import uuid
+
+from cache import TTLCache
+from intents import intent_index
+
+router = APIRouter(prefix="/api/chat", tags=["chat"])
+
+# Per-session history: a bounded ring buffer per session, idle sessions evicted LRU/TTL
+CHAT_HISTORY_LENGTH = int(os.getenv("CHAT_HISTORY_LENGTH", "20"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "10000"))
+CHAT_SESSION_IDLE_SECONDS = float(os.getenv("CHAT_SESSION_IDLE_SECONDS", "1800"))
+CHAT_RESPONSE_DELAY = float(os.getenv("CHAT_RESPONSE_DELAY", "0.5")) # simulated AI latency
+
+chat_sessions = TTLCache(maxsize=CHAT_MAX_SESSIONS, ttl=CHAT_SESSION_IDLE_SECONDS)
+
+# Schemas
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+
+class ChatResponse(BaseModel):
+    response: str
+    action_link: Optional[str] = None
+    action_text: Optional[str] = None
+    session_id: Optional[str] = None
+
+# Helpers
+def remember(session_id, sender, text):
+    history = chat_sessions.get(session_id)
+    if history is None:
+        history = deque(maxlen=CHAT_HISTORY_LENGTH)
+    history.append({"sender": sender, "text": text})
+    # Re-set on every message so only idle sessions expire
+    chat_sessions.set(session_id, history)
+    return history
+
+def generate_reply(message):
+    return intent_index.reply(message)
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Endpoints
+@router.post("", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest, x_session_id: Optional[str] = Header(None)):
+    session_id = request.session_id or x_session_id or uuid.uuid4().hex
+    remember(session_id, "user", request.message)
+
+    # Simulate AI processing time without blocking the event loop
+    await asyncio.sleep(CHAT_RESPONSE_DELAY)
+
+    reply = generate_reply(request.message)
+    remember(session_id, "ai", reply["response"])
+    return {**reply, "session_id": session_id}
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, x_session_id: Optional[str] = Header(None)):
+    # Server-Sent Events: "token" events carry the reply word by word, then a final
+    # "done" event with the action link and session id
+    session_id = request.session_id or x_session_id or uuid.uuid4().hex
+    remember(session_id, "user", request.message)
+    reply = generate_reply(request.message)
+
+    async def events():
+        words = reply["response"].split(" ")
+        delay = CHAT_RESPONSE_DELAY / max(len(words), 1)
+        for index, word in enumerate(words):
+            await asyncio.sleep(delay)
+            yield sse("token", {"text": word if index == 0 else " " + word})
+        remember(session_id, "ai", reply["response"])
+        yield sse("done", {
+            "action_link": reply["action_link"],
+            "action_text": reply["action_text"],
+            "session_id": session_id,
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/history/{session_id}")
+async def chat_history(session_id: str):
+    return list(chat_sessions.get(session_id) or [])
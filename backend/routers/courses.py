@@ -1,7 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from database import get_db
+import base64
+import json
+from database import get_db, get_async_db, upsert_insert
+from query_budget import statement_budget
+from fast_json import fast_response
+from fieldsets import parse_fields, columns
+from dashboard import invalidate_dashboard
+from progress import enrollment_values
+from intents import intent_index, course_intents
+from suggest import suggest_index
+import facets
 import models, schemas
 
 router = APIRouter(
@@ -9,42 +21,90 @@ router = APIRouter(
     tags=["courses"]
 )
 
-@router.get("/", response_model=List[schemas.Course])
-def get_courses(
-    skip: int = 0, 
-    limit: int = 100, 
+MAX_COURSE_PAGE = 500
+
+# Keyset pagination: the cursor is an opaque token for the last course id served,
+# so any page is an index seek (id > cursor) instead of OFFSET's scan-and-discard.
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=List[schemas.Course], dependencies=[Depends(statement_budget(1))])
+async def get_courses(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_COURSE_PAGE),
     branch_id: Optional[int] = None,
     year: Optional[int] = None,
-    db: Session = Depends(get_db)
+    semester: Optional[int] = None,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(models.Course)
+    # The body stays a plain list; the next page's cursor is sent in X-Next-Cursor
+    # and a Link: rel="next" header, and is absent on the last page.
+    # fields=id,title,... selects only those columns (see fieldsets.py).
+    names = parse_fields(fields, schemas.Course)
+    query = select(*columns(models.Course, names)).order_by(models.Course.id)
     
-    if branch_id or year:
-        query = query.join(models.Subject)
+    if branch_id or year or semester:
+        subjects = select(models.Subject.id)
         if branch_id:
-            query = query.filter(models.Subject.branch_id == branch_id)
+            subjects = subjects.where(models.Subject.branch_id == branch_id)
         if year:
-            query = query.filter(models.Subject.year == year)
+            subjects = subjects.where(models.Subject.year == year)
+        if semester:
+            subjects = subjects.where(models.Subject.semester == semester)
+        query = query.where(models.Course.subject_id.in_(subjects))
+    if category:
+        query = query.where(models.Course.category == category)
+
+    if cursor is not None:
+        query = query.where(models.Course.id > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip) # legacy offset paging
             
-    courses = query.offset(skip).limit(limit).all()
-    return courses
+    result = await db.execute(query.limit(limit + 1))
+    courses = result.all()
+    headers = {}
+    if len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = encode_cursor(courses[-1].id)
+        next_url = request.url.remove_query_params(["skip", "cursor"]).include_query_params(cursor=next_cursor)
+        headers = {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+    return fast_response(schemas.Course, courses, fields=names, headers=headers)
 
 @router.post("/", response_model=schemas.Course, status_code=status.HTTP_201_CREATED)
 def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
-    db_course = models.Course(**course.dict())
+    # Schema-only fields (difficulty) have no column
+    db_course = models.Course(**course.dict(include=set(models.Course.__table__.columns.keys())))
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
+    intent_index.add(course_intents([db_course])[0])
+    suggest_index.add("course", db_course.id, db_course.title)
     return db_course
 
-@router.get("/{course_id}", response_model=schemas.CourseDetail)
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+@router.get("/{course_id}", response_model=schemas.CourseDetail, dependencies=[Depends(statement_budget(3))])
+async def get_course(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    # course + modules + lessons: one statement per level, independent of catalog size
+    result = await db.execute(
+        select(models.Course)
+        .where(models.Course.id == course_id)
+        .options(selectinload(models.Course.modules).selectinload(models.Module.lessons))
+    )
+    course = result.scalars().first()
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    return fast_response(schemas.CourseDetail, course)
 
-@router.get("/lessons/{lesson_id}", response_model=schemas.Lesson)
+@router.get("/lessons/{lesson_id}", response_model=schemas.Lesson, dependencies=[Depends(statement_budget(1))])
 def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
     lesson = db.query(models.Lesson).filter(models.Lesson.id == lesson_id).first()
     if not lesson:
@@ -55,30 +115,62 @@ def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
 def enroll_course(course_id: int, db: Session = Depends(get_db)):
     user_id = 1 # Hardcoded for demo
     
-    # Check existence
-    existing = db.query(models.UserCourse).filter(
-        models.UserCourse.user_id == user_id,
-        models.UserCourse.course_id == course_id
-    ).first()
-    
-    if existing:
-        return {"message": "Already enrolled"}
-        
-    enrollment = models.UserCourse(user_id=user_id, course_id=course_id)
-    db.add(enrollment)
+    # Single INSERT ... ON CONFLICT DO NOTHING; no row back means already enrolled
+    stmt = upsert_insert(models.UserCourse).values(
+        **enrollment_values(user_id, course_id)
+    ).on_conflict_do_nothing(
+        index_elements=["user_id", "course_id"]
+    ).returning(models.UserCourse.id)
+
+    enrolled = db.execute(stmt).first()
     db.commit()
+    if enrolled is None:
+        return {"message": "Already enrolled"}
+    invalidate_dashboard(user_id)
     return {"message": "Enrolled successfully"}
 
-@router.get("/{course_id}/status")
-def get_enrollment_status(course_id: int, db: Session = Depends(get_db)):
+@router.get("/{course_id}/status", dependencies=[Depends(statement_budget(1))])
+async def get_enrollment_status(course_id: int, db: AsyncSession = Depends(get_async_db)):
     user_id = 1
-    enrollment = db.query(models.UserCourse).filter(
+    result = await db.execute(select(
+        models.UserCourse.progress_percent,
+        models.UserCourse.completed_lessons,
+        models.UserCourse.total_lessons
+    ).where(
         models.UserCourse.user_id == user_id,
         models.UserCourse.course_id == course_id
-    ).first()
-    return {"enrolled": enrollment is not None}
+    ).limit(1))
+    enrollment = result.first()
+    if enrollment is None:
+        return {"enrolled": False}
+    return {
+        "enrolled": True,
+        "progress_percent": enrollment.progress_percent or 0,
+        "completed_lessons": enrollment.completed_lessons or 0,
+        "total_lessons": enrollment.total_lessons or 0,
+    }
+
+@router.get("/meta/facets", response_model=schemas.CourseFacets, dependencies=[Depends(statement_budget(2))])
+async def get_facets(
+    branch_id: Optional[int] = None,
+    year: Optional[int] = None,
+    semester: Optional[int] = None,
+    category: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Counts per filter value for the current filter set, from the in-memory cube
+    # (see facets.py); the DB is only read when the cube is (re)loaded.
+    cube = await facets.get_cube(db)
+    total, counts = cube.counts(branch_id=branch_id, year=year, semester=semester, category=category)
+    return {
+        "total": total,
+        "branches": facets.facet_values(counts["branch_id"]),
+        "years": facets.facet_values(counts["year"]),
+        "semesters": facets.facet_values(counts["semester"]),
+        "categories": facets.facet_values(counts["category"]),
+    }
 
-@router.get("/meta/branches")
-def get_branches(db: Session = Depends(get_db)):
-    branches = db.query(models.Branch).all()
-    return branches
+@router.get("/meta/branches", dependencies=[Depends(statement_budget(1))])
+async def get_branches(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.Branch))
+    return result.scalars().all()
@@ -1,18 +1,40 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from pydantic import BaseModel
-import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
 
-from database import get_db
+from database import get_async_db
+from resume_jobs import job_manager
+import job_index
 import models
+import resume_cache
+import skill_catalog
 
 router = APIRouter(
     prefix="/api/resume",
     tags=["resume"]
 )
 
+class JobPostingCreate(BaseModel):
+    title: str
+    company: str
+    location: str
+    salary_range: str
+    description: str
+
+class JobPosting(JobPostingCreate):
+    id: int
+
 class JobRecommendation(BaseModel):
+    id: Optional[int] = None
     title: str
     company: str
     location: str
@@ -22,52 +44,244 @@ class JobRecommendation(BaseModel):
 class ResumeAnalysisResponse(BaseModel):
     score: int
     match_role: str
+    skills_found: List[str] = []
     missing_skills: List[str]
     recommendation: str
     recommended_jobs: List[JobRecommendation] = []
 
+class ResumeJob(BaseModel):
+    job_id: str
+    status: str # pending, completed, failed
+    filename: Optional[str] = None
+    result: Optional[ResumeAnalysisResponse] = None
+    error: Optional[str] = None
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(5 * 1024 * 1024)))
+# Bulk analysis: documents extracted/queued at once, and the most a batch may hold
+RESUME_BULK_IN_FLIGHT = int(os.getenv("RESUME_BULK_IN_FLIGHT", str(2 * job_manager.workers)))
+RESUME_BULK_MAX_DOCUMENTS = int(os.getenv("RESUME_BULK_MAX_DOCUMENTS", "1000"))
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+JOB_EXPIRED = "Analysis result expired before it could be read"
+
+async def save_upload(file: UploadFile):
+    # Stream the upload to a temp file the worker process can read, hashing as we go.
+    # Memory stays at one chunk whatever the file size; oversized files are rejected.
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=os.path.splitext(file.filename or "")[1])
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > RESUME_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Resume exceeds {RESUME_MAX_BYTES // 1024} KiB"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+async def attach_jobs(result, index):
+    # Jobs are ranked when a result is served (not cached with it), so new postings show up
+    jobs = (await asyncio.to_thread(index.rank, [result.get("skills_found", [])]))[0]
+    return {**result, "recommended_jobs": jobs}
+
+async def with_jobs(job, db: AsyncSession):
+    if job is not None and job["status"] == "completed":
+        job["result"] = await attach_jobs(job["result"], await job_index.get_index(db))
+    return job
+
+def save_member(archive, info):
+    # save_upload for one ZIP member (runs in a thread); ValueError when it's too big
+    if info.file_size > RESUME_MAX_BYTES:
+        raise ValueError(f"Resume exceeds {RESUME_MAX_BYTES // 1024} KiB")
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=os.path.splitext(info.filename)[1])
+    try:
+        with os.fdopen(fd, "wb") as out, archive.open(info) as member:
+            while chunk := member.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > RESUME_MAX_BYTES: # the header's size can lie
+                    raise ValueError(f"Resume exceeds {RESUME_MAX_BYTES // 1024} KiB")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+def is_zip(file: UploadFile):
+    return (file.filename or "").lower().endswith(".zip") or file.content_type in ZIP_CONTENT_TYPES
+
+async def iter_documents(files: List[UploadFile]):
+    # Yields (filename, (path, digest), error) one document at a time. ZIP batches are
+    # expanded member by member, so only documents actually pulled sit on disk.
+    for file in files:
+        if not is_zip(file):
+            try:
+                yield file.filename, await save_upload(file), None
+            except HTTPException as e:
+                yield file.filename, None, e.detail
+            continue
+        try:
+            archive = zipfile.ZipFile(file.file)
+        except zipfile.BadZipFile:
+            yield file.filename, None, "Not a valid ZIP archive"
+            continue
+        with archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                    continue
+                try:
+                    yield info.filename, await asyncio.to_thread(save_member, archive, info), None
+                except (ValueError, zipfile.BadZipFile, RuntimeError) as e:
+                    yield info.filename, None, str(e)
+
+async def analyze_bulk(files: List[UploadFile], db: AsyncSession):
+    # Yields one result per document as it finishes (not in upload order; "index" is the
+    # position in the batch). A semaphore slot is held from extraction until the result is
+    # queued for the client, so documents on disk, in the pool and awaiting the client
+    # are all bounded by RESUME_BULK_IN_FLIGHT whatever the batch size.
+    catalog = await skill_catalog.get_catalog(db)
+    jobs = await job_index.get_index(db) # one snapshot for the whole batch
+    in_flight = asyncio.Semaphore(RESUME_BULK_IN_FLIGHT)
+    results = asyncio.Queue(maxsize=RESUME_BULK_IN_FLIGHT)
+    running = set()
+
+    async def finish(index, filename, job):
+        line = {"index": index, "filename": filename, "status": job["status"]}
+        if job["status"] == "completed":
+            line["result"] = await attach_jobs(job["result"], jobs)
+        else:
+            line["error"] = job["error"] or "Resume analysis failed"
+        await results.put(line)
+        in_flight.release()
+
+    async def analyze(index, filename, path, digest):
+        try:
+            job = job_manager.submit(
+                path, filename,
+                catalog=(catalog.version, catalog.skills),
+                cache_key=(digest, catalog.version),
+            )
+            job = await job_manager.wait(job["job_id"])
+        except Exception as e:
+            job = {"status": "failed", "error": str(e)}
+        if job is None:
+            # Evicted from the job table before we read it back
+            job = {"status": "failed", "error": JOB_EXPIRED}
+        await finish(index, filename, job)
+
+    async def produce():
+        documents = iter_documents(files)
+        index = 0
+        try:
+            while True:
+                await in_flight.acquire()
+                document = await anext(documents, None)
+                if document is None:
+                    in_flight.release()
+                    break
+                filename, saved, error = document
+                if index >= RESUME_BULK_MAX_DOCUMENTS:
+                    if saved is not None:
+                        os.remove(saved[0])
+                    await finish(index, filename, {"status": "failed", "error": f"Batch is limited to {RESUME_BULK_MAX_DOCUMENTS} documents"})
+                    break
+                if error is not None:
+                    await finish(index, filename, {"status": "failed", "error": error})
+                else:
+                    path, digest = saved
+                    cached = await resume_cache.lookup(db, digest, catalog.version)
+                    if cached is not None:
+                        os.remove(path)
+                        await finish(index, filename, {"status": "completed", "result": cached})
+                    else:
+                        task = asyncio.create_task(analyze(index, filename, path, digest))
+                        running.add(task)
+                        task.add_done_callback(running.discard)
+                index += 1
+            if running:
+                await asyncio.gather(*running)
+        finally:
+            await documents.aclose()
+            await results.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (line := await results.get()) is not None:
+            yield line
+        await producer # surfaces producer errors
+    finally:
+        # Client went away: stop feeding the pool (jobs already submitted still clean up)
+        producer.cancel()
+        for task in list(running):
+            task.cancel()
+
+async def start_analysis(file: UploadFile, db: AsyncSession):
+    # Returns a job; repeat uploads against the same skill catalog come straight from the cache
+    path, content_hash = await save_upload(file)
+    catalog = await skill_catalog.get_catalog(db)
+    cached = await resume_cache.lookup(db, content_hash, catalog.version)
+    if cached is not None:
+        os.remove(path)
+        return job_manager.completed(file.filename, cached)
+    return job_manager.submit(
+        path, file.filename,
+        catalog=(catalog.version, catalog.skills),
+        cache_key=(content_hash, catalog.version),
+    )
+
+@router.post("/jobs", response_model=ResumeJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_resume_job(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    # Returns immediately; poll GET /api/resume/jobs/{job_id} for the result
+    return await with_jobs(await start_analysis(file, db), db)
+
+@router.get("/jobs/{job_id}", response_model=ResumeJob)
+async def get_resume_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await with_jobs(job, db)
+
 @router.post("/analyze", response_model=ResumeAnalysisResponse)
-async def analyze_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    # Simulating resume parsing latency
-    time.sleep(1.5)
-    
-    # In a real implementation:
-    # 1. Read file content: content = await file.read()
-    # 2. Extract text (PDF/Docx)
-    # 3. NLP to extract skills
-    
-    # Mock Logic:
-    # We will just return a mocked analysis that drives the user to the new content
-    
-    # Fetch all skills to "compare" against (mock)
-    all_skills = db.query(models.Skill).all()
-    
-    return {
-        "score": 75,
-        "match_role": "Junior Security Analyst",
-        "missing_skills": ["Network Forensics", "Advanced Python", "Penetration Testing"],
-        "recommendation": "Based on your resume, we recommend enrolling in the 'Cyber Security Specialist' path to bridge the gap.",
-        "recommended_jobs": [
-            {
-                "title": "Junior SOC Analyst",
-                "company": "CyberGuard Solutions",
-                "location": "Remote",
-                "salary_range": "$70k - $90k",
-                "match_score": 85
-            },
-            {
-                "title": "Network Security Intern",
-                "company": "TechCorp",
-                "location": "San Francisco, CA",
-                "salary_range": "$60k - $75k",
-                "match_score": 92
-            },
-            {
-                "title": "IT Security Associate",
-                "company": "FinSecure Bank",
-                "location": "New York, NY",
-                "salary_range": "$80k - $100k",
-                "match_score": 70
-            }
-        ]
-    }
+async def analyze_resume(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    # Same job path, but waits for the result (the event loop stays free meanwhile)
+    job = await start_analysis(file, db)
+    if job["status"] == "pending":
+        job = await job_manager.wait(job["job_id"])
+    if job is None:
+        raise HTTPException(status_code=500, detail=JOB_EXPIRED)
+    if job["status"] != "completed":
+        raise HTTPException(status_code=500, detail=job["error"] or "Resume analysis failed")
+    return (await with_jobs(job, db))["result"]
+
+@router.post("/analyze/bulk")
+async def analyze_resumes_bulk(files: List[UploadFile] = File(...), db: AsyncSession = Depends(get_async_db)):
+    # Batch of resumes (individual files and/or ZIP archives of them). Streams NDJSON,
+    # one {"index", "filename", "status", "result" | "error"} line per document as it completes.
+    async def lines():
+        async for line in analyze_bulk(files, db):
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/postings", response_model=List[JobPosting])
+async def get_job_postings(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.JobPosting).order_by(models.JobPosting.id).offset(skip).limit(limit))
+    return result.scalars().all()
+
+@router.post("/postings", response_model=JobPosting)
+async def create_job_posting(posting: JobPostingCreate, db: AsyncSession = Depends(get_async_db)):
+    db_posting = models.JobPosting(**posting.dict())
+    db.add(db_posting)
+    await db.commit()
+    await job_index.get_index(db, force=True) # append it to the match index right away
+    return db_posting
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from database import get_async_db
+from query_budget import statement_budget
+from suggest import suggest_index, SUGGEST_TOP_K
+import search_index
+import schemas
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["search"]
+)
+
+MAX_SEARCH_LIMIT = 50
+
+@router.get("/", response_model=schemas.SearchResults, dependencies=[Depends(statement_budget(1))])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[Literal["course", "subject", "lesson"]] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # BM25-ranked hits across courses, subjects and lessons (see search_index.py)
+    match = search_index.match_expression(q)
+    if match is None:
+        return {"query": q, "results": []}
+    try:
+        result = await db.execute(search_index.search_statement(type), {
+            "match": match,
+            "open": search_index.MATCH_OPEN,
+            "close": search_index.MATCH_CLOSE,
+            "limit": limit + 1,
+            "skip": skip,
+        })
+    except DBAPIError:
+        # No FTS table: OperationalError on SQLite without FTS5, ProgrammingError elsewhere
+        raise HTTPException(status_code=503, detail="Search index unavailable")
+    rows = result.all()
+    next_skip = skip + limit if len(rows) > limit else None
+    return {
+        "query": q,
+        "results": [search_index.to_hit(row) for row in rows[:limit]],
+        "next_skip": next_skip,
+    }
+
+@router.get("/suggest", response_model=List[schemas.Suggestion], dependencies=[Depends(statement_budget(0))])
+async def suggest(
+    q: str = Query(..., max_length=100),
+    type: Optional[Literal["course", "skill", "subject"]] = None,
+    limit: int = Query(SUGGEST_TOP_K, ge=1, le=SUGGEST_TOP_K)
+):
+    # Typeahead from the in-memory prefix index (see suggest.py); no DB access
+    return [
+        {"type": kind, "id": id, "label": label, "popularity": weight}
+        for kind, id, label, weight in suggest_index.suggest(q, type, limit)
+    ]
@@ -1,18 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import List
-from database import get_db
+from database import get_db, get_async_db, upsert_insert
+from query_budget import statement_budget
+from fast_json import fast_response
 import models, schemas
-from routers.auth import get_current_user
+from routers.auth import Principal, get_current_user
+import skill_catalog
+from skill_index import split_aliases
+from suggest import suggest_index
 
 router = APIRouter(
     prefix="/api/skills",
     tags=["skills"]
 )
 
-@router.get("/", response_model=List[schemas.Skill])
-def get_all_skills(db: Session = Depends(get_db)):
-    return db.query(models.Skill).all()
+@router.get("/", response_model=List[schemas.Skill], dependencies=[Depends(statement_budget(1))])
+async def get_all_skills(db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.Skill))
+    return fast_response(schemas.Skill, result.scalars().all())
 
 @router.post("/", response_model=schemas.Skill)
 def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db)):
@@ -20,33 +28,44 @@ def create_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db)):
     db.add(db_skill)
     db.commit()
     db.refresh(db_skill)
+    skill_catalog.invalidate()
+    suggest_index.add("skill", db_skill.id, db_skill.name, names=split_aliases(db_skill.aliases))
     return db_skill
 
-@router.get("/me", response_model=List[schemas.UserSkill])
-def get_my_skills(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return current_user.skills
+@router.get("/me", response_model=List[schemas.UserSkill], dependencies=[Depends(statement_budget(2))])
+def get_my_skills(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    # user lookup (auth, skipped once the token is cached) + skills joined to their Skill rows
+    return fast_response(schemas.UserSkill, db.query(models.UserSkill).options(joinedload(models.UserSkill.skill)).filter(
+        models.UserSkill.user_id == current_user.id
+    ).all())
 
-@router.post("/me", response_model=schemas.UserSkill)
-def add_user_skill(skill_data: schemas.UserSkillCreate, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Check if user already has this skill
-    exists = db.query(models.UserSkill).filter(
-        models.UserSkill.user_id == current_user.id,
-        models.UserSkill.skill_id == skill_data.skill_id
-    ).first()
-    
-    if exists:
-        exists.proficiency = skill_data.proficiency
-        db.commit()
-        db.refresh(exists)
-        return exists
-        
-    user_skill = models.UserSkill(
+@router.post("/me", response_model=schemas.UserSkill, dependencies=[Depends(statement_budget(3))])
+async def add_user_skill(skill_data: schemas.UserSkillCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    # The nested Skill comes from the catalog snapshot, so with the principal and catalog
+    # cached this is a single INSERT ... ON CONFLICT on (user_id, skill_id) (budget: +1
+    # user lookup, +1 catalog load when cold); re-adding a skill only updates proficiency
+    catalog = await skill_catalog.get_catalog(db)
+    skill = catalog.by_id.get(skill_data.skill_id)
+    if skill is None:
+        raise HTTPException(status_code=404, detail="Skill not found")
+
+    stmt = upsert_insert(models.UserSkill).values(
         user_id=current_user.id,
         skill_id=skill_data.skill_id,
         proficiency=skill_data.proficiency,
         verified=skill_data.verified
     )
-    db.add(user_skill)
-    db.commit()
-    db.refresh(user_skill)
-    return user_skill
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "skill_id"],
+        set_={"proficiency": stmt.excluded.proficiency}
+    ).returning(models.UserSkill.id, models.UserSkill.proficiency, models.UserSkill.verified)
+
+    user_skill = (await db.execute(stmt)).one()
+    await db.commit()
+    skill_id, name, category, aliases = skill
+    return {
+        "id": user_skill.id,
+        "proficiency": user_skill.proficiency,
+        "verified": user_skill.verified,
+        "skill": {"id": skill_id, "name": name, "category": category, "aliases": aliases},
+    }
@@ -1,9 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
+from datetime import datetime
 
-from database import get_db
+from database import get_db, get_async_db
+from progress import MAX_BATCH_SIZE, apply_progress_batch, progress_context, write_progress
+from progress_buffer import progress_buffer
+from dashboard import invalidate_dashboard
+from query_budget import statement_budget
+from fast_json import FastJSONResponse, fast_response
+from fieldsets import parse_fields, columns
 import models
 import schemas
 # from .auth import oauth2_scheme # In real app, protect these routes
@@ -38,56 +47,107 @@ def update_profile(user_update: schemas.UserUpdate, db: Session = Depends(get_db
     db.refresh(user)
     return user
 
-@router.get("/me", response_model=schemas.UserResponse)
-def get_my_profile(db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == 1).first()
+@router.get("/me", response_model=schemas.UserResponse, dependencies=[Depends(statement_budget(1))])
+async def get_my_profile(db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(models.User, 1)
     return user
 
 @router.post("/progress", response_model=schemas.ProgressResponse)
 def update_progress(progress: schemas.ProgressUpdate, db: Session = Depends(get_db)):
     user_id = 1 # Hardcoded for demo
     
-    # Check if entry exists
-    db_progress = db.query(models.UserProgress).filter(
-        models.UserProgress.user_id == user_id, 
-        models.UserProgress.lesson_id == progress.lesson_id
-    ).first()
-    
-    if db_progress:
-        db_progress.completed = progress.completed
-        if progress.score is not None:
-            db_progress.score = progress.score
-    else:
-        db_progress = models.UserProgress(
-            user_id=user_id,
-            lesson_id=progress.lesson_id,
-            completed=progress.completed,
-            score=progress.score
-        )
-        db.add(db_progress)
-        
+    # Video/simulation heartbeats are coalesced in memory and written in batches
+    if progress_buffer.is_heartbeat(db, progress):
+        row = progress_buffer.add(user_id, progress)
+        return {**row, "last_accessed": datetime.utcnow()}
+
+    # A direct write supersedes any buffered heartbeat for the same lesson
+    score = progress.score
+    for pending in progress_buffer.take(user_id, [progress.lesson_id]):
+        if score is None:
+            score = pending["score"]
+
+    # One context query (lesson's course + stored state), one upsert and a recount
+    # of the enrollment counters
+    courses, stored = progress_context(db, [user_id], [progress.lesson_id])
+    if progress.lesson_id not in courses:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    row = {"user_id": user_id, "lesson_id": progress.lesson_id, "completed": progress.completed, "score": score}
+    written = write_progress(db, [row], courses, stored)[0]
+    db.commit()
+    invalidate_dashboard(user_id)
+    return {**written, "last_accessed": datetime.utcnow()}
+
+@router.post("/progress/batch", response_model=List[schemas.ProgressBatchResult])
+def update_progress_batch(updates: List[schemas.ProgressUpdate], db: Session = Depends(get_db)):
+    user_id = 1 # Hardcoded for demo
+    if len(updates) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} progress updates per batch")
+    if not updates:
+        return []
+
+    # Buffered heartbeats for these lessons are older than the batch; apply them first
+    pending = [
+        schemas.ProgressUpdate(**row)
+        for row in progress_buffer.take(user_id, {u.lesson_id for u in updates})
+    ]
+
+    # One transaction, one executemany upsert for the whole batch
+    results = apply_progress_batch(db, user_id, pending + updates)
     db.commit()
-    db.refresh(db_progress)
-    return db_progress
+    invalidate_dashboard(user_id)
+    return results[len(pending):]
 
-@router.get("/progress/{course_id}", response_model=List[schemas.ProgressResponse])
+@router.get("/progress/{course_id}", response_model=List[schemas.ProgressResponse], dependencies=[Depends(statement_budget(1))])
 def get_course_progress(course_id: int, db: Session = Depends(get_db)):
     user_id = 1
-    # Get all lessons for this course to filter progress? 
-    # Or just return all progress for user and let frontend filter? 
-    # Better: return progress for user where lesson belongs to course.
-    # Joining: UserProgress -> Lesson -> Module -> Course
-    results = db.query(models.UserProgress).join(models.Lesson).join(models.Module).filter(
-        models.UserProgress.user_id == user_id,
-        models.Module.course_id == course_id
+    # Stored progress on the course's lessons, with this user's buffered heartbeats
+    # laid over it in memory (read-your-writes without flushing on every read)
+    stored = db.execute(
+        select(
+            models.Lesson.id,
+            models.UserProgress.id,
+            models.UserProgress.completed,
+            models.UserProgress.score,
+            models.UserProgress.last_accessed,
+        )
+        .join(models.Module, models.Module.id == models.Lesson.module_id)
+        .outerjoin(models.UserProgress, and_(
+            models.UserProgress.lesson_id == models.Lesson.id,
+            models.UserProgress.user_id == user_id,
+        ))
+        .where(models.Module.course_id == course_id)
     ).all()
-    return results
+    pending = progress_buffer.pending_for(user_id)
+
+    results = []
+    for lesson_id, progress_id, completed, score, last_accessed in stored:
+        if lesson_id in pending:
+            # Same merge the flush upsert does: a missing score keeps the stored one
+            row, accessed = pending[lesson_id]
+            completed, last_accessed = row["completed"], accessed
+            score = row["score"] if row["score"] is not None else score
+        elif progress_id is None:
+            continue
+        results.append({"lesson_id": lesson_id, "completed": bool(completed), "score": score, "last_accessed": last_accessed})
+    return FastJSONResponse(results)
+
+ENROLLMENT_COUNTERS = ("progress_percent", "completed_lessons", "total_lessons")
 
-@router.get("/me/courses", response_model=List[schemas.Course])
-def get_my_courses(db: Session = Depends(get_db)):
+@router.get("/me/courses", response_model=List[schemas.EnrolledCourse], dependencies=[Depends(statement_budget(1))])
+def get_my_courses(fields: Optional[str] = None, db: Session = Depends(get_db)):
     user_id = 1
-    # Join UserCourse to Course
-    courses = db.query(models.Course).join(models.UserCourse).filter(
-        models.UserCourse.user_id == user_id
+    names = parse_fields(fields, schemas.EnrolledCourse)
+    # Join UserCourse to Course; the completion counters live on the enrollment row.
+    # Only the requested columns are selected (see fieldsets.py).
+    counters = [
+        func.coalesce(getattr(models.UserCourse, name), 0).label(name)
+        for name in ENROLLMENT_COUNTERS if name in names
+    ]
+    rows = db.execute(
+        select(*columns(models.Course, names), *counters)
+        .select_from(models.Course)
+        .join(models.UserCourse)
+        .where(models.UserCourse.user_id == user_id)
     ).all()
-    return courses
+    return fast_response(schemas.EnrolledCourse, rows, fields=names)
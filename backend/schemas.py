@@ -1,10 +1,11 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 class SkillBase(BaseModel):
     name: str
     category: str
+    aliases: Optional[str] = None # comma separated alternative spellings
 
 class SkillCreate(SkillBase):
     pass
@@ -31,6 +32,11 @@ class Course(CourseBase):
     class Config:
         orm_mode = True
 
+class EnrolledCourse(Course):
+    progress_percent: int = 0
+    completed_lessons: int = 0
+    total_lessons: int = 0
+
 class LessonBase(BaseModel):
     title: str
     content_type: str
@@ -86,6 +92,11 @@ class ProgressUpdate(BaseModel):
     completed: bool
     score: Optional[int] = None
 
+class ProgressBatchResult(BaseModel):
+    lesson_id: int
+    status: str # "ok" or "error"
+    detail: Optional[str] = None
+
 class ProgressResponse(BaseModel):
     lesson_id: int
     completed: bool
@@ -93,3 +104,33 @@ class ProgressResponse(BaseModel):
     last_accessed: datetime
     class Config:
         orm_mode = True
+
+class SearchHit(BaseModel):
+    type: str # "course", "subject" or "lesson"
+    id: int
+    course_id: Optional[int] = None # course to open for course and lesson hits
+    title: str # HTML-escaped, with <mark>...</mark> around matched terms
+    snippet: Optional[str] = None # same markup as title
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    next_skip: Optional[int] = None # absent on the last page
+
+class Suggestion(BaseModel):
+    type: str # "course", "skill" or "subject"
+    id: int
+    label: str
+    popularity: float
+
+class FacetValue(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class CourseFacets(BaseModel):
+    total: int # courses matching every filter
+    branches: List[FacetValue] # value: branch id
+    years: List[FacetValue]
+    semesters: List[FacetValue]
+    categories: List[FacetValue]
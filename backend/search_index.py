@@ -0,0 +1,133 @@
+import html
+import logging
+import re
+
+from sqlalchemy import text
+
+# Full-text search over the catalog: one SQLite FTS5 table for courses
+# (title, description), subjects (title, code) and lessons (title), kept in sync by
+# triggers on the source tables, so every write path (ORM, seed scripts, raw SQL)
+# updates it in the same transaction.
+# The FTS rowid encodes the source row: id * 4 + kind. Trigger updates and deletes
+# are then rowid lookups instead of scans over an UNINDEXED kind column.
+# Ranking is bm25 with titles weighted over bodies, stored as the table's rank
+# config so ORDER BY rank LIMIT stays inside FTS5.
+# Titles and snippets are returned as HTML: FTS5 marks matches with private-use
+# characters, the text is escaped (it comes from user-submitted courses) and only
+# then are the markers turned into <mark> tags.
+logger = logging.getLogger("skilltree.search")
+
+SEARCH_TABLE = "search_index"
+KINDS = {"course": 1, "subject": 2, "lesson": 3}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+MATCH_OPEN = "\ue000"
+MATCH_CLOSE = "\ue001"
+SNIPPET_TOKENS = 16
+
+# kind -> (source table, title expression, body expression)
+SOURCES = {
+    "course": ("courses", "title", "description"),
+    "subject": ("subjects", "title", "code"),
+    "lesson": ("lessons", "title", "NULL"),
+}
+
+
+def _row(kind, alias):
+    _, title, body = SOURCES[kind]
+    title, body = (column if column == "NULL" else f"{alias}.{column}" for column in (title, body))
+    return f"{alias}.id * 4 + {KINDS[kind]}", title, body
+
+
+def _trigger_ddl(kind):
+    table, title, body = SOURCES[kind]
+    new_rowid, new_title, new_body = _row(kind, "new")
+    old_rowid = _row(kind, "old")[0]
+    insert = f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) VALUES ({new_rowid}, {new_title}, {new_body});"
+    delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {old_rowid};"
+    watched = ", ".join(column for column in (title, body) if column != "NULL")
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {watched} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+def ensure_search_index(engine, rebuild=False):
+    # Create the FTS table and triggers if missing; (re)fill it when it was just
+    # created or rebuild=True. Returns False on databases without FTS5.
+    if engine.dialect.name != "sqlite":
+        logger.warning("Full-text search needs SQLite FTS5; %s is not supported", engine.dialect.name)
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+        ).first() is not None
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+        conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25({TITLE_WEIGHT}, {BODY_WEIGHT})')"))
+        for kind in SOURCES:
+            for ddl in _trigger_ddl(kind):
+                conn.execute(text(ddl))
+        if rebuild or not exists:
+            conn.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+            for kind, (table, _, _) in SOURCES.items():
+                rowid, title, body = _row(kind, table)
+                conn.execute(text(f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) SELECT {rowid}, {title}, {body} FROM {table}"))
+            conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+    return True
+
+
+def match_expression(query):
+    # User text -> FTS5 query: every word must match, the last one as a prefix
+    # (search-as-you-type). Words are quoted so FTS5 operators in the input are inert.
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+# Ranked page first (FTS5 handles ORDER BY rank LIMIT), then lessons are joined
+# to their course for linking.
+SEARCH_SQL = f"""
+SELECT hit.rowid AS rowid, hit.title AS title, hit.snippet AS snippet, hit.score AS score,
+       CASE hit.rowid % 4 WHEN {KINDS["course"]} THEN hit.rowid / 4 ELSE modules.course_id END AS course_id
+FROM (
+    SELECT rowid,
+           highlight({SEARCH_TABLE}, 0, :open, :close) AS title,
+           snippet({SEARCH_TABLE}, 1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet,
+           rank AS score
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH :match {{kind_filter}}
+    ORDER BY rank
+    LIMIT :limit OFFSET :skip
+) AS hit
+LEFT JOIN lessons ON hit.rowid % 4 = {KINDS["lesson"]} AND lessons.id = hit.rowid / 4
+LEFT JOIN modules ON modules.id = lessons.module_id
+ORDER BY hit.score
+"""
+
+
+def search_statement(kind=None):
+    kind_filter = f"AND rowid % 4 = {KINDS[kind]}" if kind else ""
+    return text(SEARCH_SQL.format(kind_filter=kind_filter))
+
+
+def to_markup(text):
+    return html.escape(text).replace(MATCH_OPEN, HIGHLIGHT_OPEN).replace(MATCH_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def to_hit(row):
+    return {
+        "type": KIND_NAMES[row.rowid % 4],
+        "id": row.rowid // 4,
+        "course_id": row.course_id,
+        "title": to_markup(row.title or ""),
+        "snippet": to_markup(row.snippet) if row.snippet else None,
+        "score": -row.score, # bm25 is lower-is-better; flip so higher means more relevant
+    }
@@ -5,11 +5,11 @@ def seed_skills():
     db = SessionLocal()
     
     skills = [
-        {"name": "Python", "category": "Backend"},
-        {"name": "Network Security", "category": "Cyber Security"},
-        {"name": "React", "category": "Frontend"},
-        {"name": "Algorithms", "category": "CSE"},
-        {"name": "Digital Logic", "category": "CSE"}
+        {"name": "Python", "category": "Backend", "aliases": "python3, py"},
+        {"name": "Network Security", "category": "Cyber Security", "aliases": "netsec, firewalls"},
+        {"name": "React", "category": "Frontend", "aliases": "react.js, reactjs"},
+        {"name": "Algorithms", "category": "CSE", "aliases": "data structures and algorithms, dsa"},
+        {"name": "Digital Logic", "category": "CSE", "aliases": "logic design, digital electronics"}
     ]
 
     print("Seeding skills...")
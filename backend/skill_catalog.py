@@ -0,0 +1,41 @@
+import hashlib
+import threading
+
+from sqlalchemy import select
+
+import models
+
+# Snapshot of the Skill catalog used by resume analysis.
+# The version is a digest of the catalog contents, so analyses cached under one
+# version are never served once skills change. create_skill calls invalidate().
+
+
+class CatalogSnapshot:
+    def __init__(self, skills):
+        self.skills = tuple(skills) # (id, name, category, aliases)
+        self.by_id = {skill[0]: skill for skill in self.skills}
+        self.version = hashlib.sha1(repr(self.skills).encode("utf-8")).hexdigest()[:16]
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+async def get_catalog(db):
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        rows = (await db.execute(
+            select(models.Skill.id, models.Skill.name, models.Skill.category, models.Skill.aliases)
+            .order_by(models.Skill.id)
+        )).all()
+        snapshot = CatalogSnapshot(tuple(row) for row in rows)
+        with _lock:
+            _snapshot = snapshot
+    return snapshot
+
+
+def invalidate():
+    global _snapshot
+    with _lock:
+        _snapshot = None
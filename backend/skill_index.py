@@ -0,0 +1,42 @@
+from phrase_matcher import PhraseMatcher
+
+# Compiled skill-extraction index over a catalog snapshot's skills (see skill_catalog.py).
+# Every skill name and alias goes into one phrase matcher, so extraction is a single
+# pass over the resume's tokens however large the catalog gets. Kept free of DB
+# imports: resume workers build it from the snapshot they are handed.
+
+
+def split_aliases(aliases):
+    return [alias.strip() for alias in (aliases or "").split(",") if alias.strip()]
+
+
+class SkillIndex:
+    def __init__(self, skills):
+        # skills: (id, name, category, aliases) tuples
+        self.skills = {skill[0]: skill for skill in skills}
+        self.by_category = {}
+        self.matcher = PhraseMatcher()
+        for skill_id, name, category, aliases in self.skills.values():
+            self.by_category.setdefault(category, []).append(skill_id)
+            for phrase in [name] + split_aliases(aliases):
+                self.matcher.add(phrase, skill_id)
+        self.matcher.compile()
+
+    def extract(self, text):
+        # {skill_id: occurrences}
+        found = {}
+        for _, _, skill_id in self.matcher.finditer(text):
+            found[skill_id] = found.get(skill_id, 0) + 1
+        return found
+
+
+# One compiled index per catalog version and process; a new version (skill added)
+# is compiled on first use and replaces the old one.
+_index = None
+
+
+def index_for(version, skills):
+    global _index
+    if _index is None or _index[0] != version:
+        _index = (version, SkillIndex(skills))
+    return _index[1]
@@ -0,0 +1,130 @@
+import heapq
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+
+from sqlalchemy import func, select
+
+from skill_index import split_aliases
+import models
+
+# Typeahead over course titles, skill names (and aliases) and subject titles/codes.
+# Every word suffix of a label ("digital logic design", "logic design", "design")
+# is kept in one sorted list, so the keys matching a prefix are a contiguous
+# bisect range. Small ranges are ranked on the spot; broad prefixes ("d", "da")
+# keep a memoized top-k that inserts update in place. Labels are weighted by
+# popularity: enrollments per course, learners per skill, courses per subject.
+# Built at startup, extended by create_course / create_skill; each process keeps
+# its own copy.
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "10"))
+SUGGEST_SCAN_LIMIT = int(os.getenv("SUGGEST_SCAN_LIMIT", "256")) # wider ranges use the memoized top-k
+WARM_PREFIX_LENGTH = 2
+
+
+def normalize(text):
+    return " ".join(re.findall(r"\w+", (text or "").casefold()))
+
+
+def word_suffixes(text):
+    words = normalize(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    def __init__(self, entries=(), k=SUGGEST_TOP_K, scan_limit=SUGGEST_SCAN_LIMIT):
+        # entries: (kind, id, label, weight, extra searchable names)
+        self.k = k
+        self.scan_limit = scan_limit
+        self._lock = threading.Lock()
+        # (entries, sorted (key, entry index) list, (prefix, kind) -> best entry indexes);
+        # swapped as one tuple by replace(), appended to in place by add()
+        self._state = self._build(entries)
+
+    def _build(self, entries):
+        state = ([], [], {})
+        for entry in entries:
+            state[1].extend(self._register(state[0], *entry))
+        state[1].sort()
+        # Precompute the broad one/two character prefixes so first keystrokes don't pay for them
+        keys = state[1]
+        for prefix in {key[:n] for key, _ in keys for n in range(1, WARM_PREFIX_LENGTH + 1)}:
+            lo, hi = self._range(keys, prefix)
+            if hi - lo > self.scan_limit:
+                state[2][(prefix, None)] = self._rank(state[0], (index for _, index in keys[lo:hi]))
+        return state
+
+    @staticmethod
+    def _register(entries, kind, id, label, weight=0, names=()):
+        index = len(entries)
+        entries.append((kind, id, label, float(weight)))
+        return [(key, index) for key in {key for name in (label, *names) for key in word_suffixes(name)}]
+
+    @staticmethod
+    def _range(keys, prefix):
+        return bisect_left(keys, (prefix,)), bisect_left(keys, (prefix + "\U0010ffff",))
+
+    def _rank(self, entries, indexes, kind=None):
+        if kind is not None:
+            indexes = (i for i in indexes if entries[i][0] == kind)
+        return heapq.nsmallest(self.k, set(indexes), key=lambda i: (-entries[i][3], entries[i][2]))
+
+    def replace(self, entries):
+        state = self._build(entries)
+        with self._lock:
+            self._state = state
+
+    def add(self, kind, id, label, weight=0, names=()):
+        with self._lock:
+            entries, keys, top = self._state
+            for key, index in self._register(entries, kind, id, label, weight, names):
+                insort(keys, (key, index))
+                # Memoized broad prefixes of the new key take it in if it ranks
+                for n in range(1, len(key) + 1):
+                    for memo in ((key[:n], None), (key[:n], kind)):
+                        best = top.get(memo)
+                        if best is not None and index not in best:
+                            top[memo] = self._rank(entries, best + [index])
+
+    def suggest(self, text, kind=None, limit=None):
+        # Best labels with a word starting with text: [(kind, id, label, weight)]
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        entries, keys, top = self._state
+        best = top.get((prefix, kind))
+        if best is None:
+            lo, hi = self._range(keys, prefix)
+            best = self._rank(entries, (index for _, index in keys[lo:hi]), kind)
+            if hi - lo > self.scan_limit:
+                with self._lock:
+                    top.setdefault((prefix, kind), best)
+        return [entries[i] for i in best[:limit or self.k]]
+
+    def __len__(self):
+        return len(self._state[0])
+
+
+suggest_index = PrefixIndex()
+
+
+def load_suggestions(db):
+    enrollments = dict(db.execute(
+        select(models.UserCourse.course_id, func.count()).group_by(models.UserCourse.course_id)
+    ).all())
+    learners = dict(db.execute(
+        select(models.UserSkill.skill_id, func.count()).group_by(models.UserSkill.skill_id)
+    ).all())
+    course_counts = dict(db.execute(
+        select(models.Course.subject_id, func.count()).group_by(models.Course.subject_id)
+    ).all())
+
+    entries = []
+    for id, title in db.execute(select(models.Course.id, models.Course.title)):
+        entries.append(("course", id, title, enrollments.get(id, 0), ()))
+    for id, name, aliases in db.execute(select(models.Skill.id, models.Skill.name, models.Skill.aliases)):
+        entries.append(("skill", id, name, learners.get(id, 0), split_aliases(aliases)))
+    for id, title, code in db.execute(select(models.Subject.id, models.Subject.title, models.Subject.code)):
+        entries.append(("subject", id, title, course_counts.get(id, 0), (code,) if code else ()))
+    suggest_index.replace(entries)
+    return len(entries)
@@ -0,0 +1,59 @@
+import urllib.request
+import urllib.parse
+import urllib.error
+import json
+
+BASE_URL = "http://localhost:8000"
+
+def post(path, data=None, form=None, token=None):
+    if form is not None:
+        body, content_type = urllib.parse.urlencode(form).encode(), "application/x-www-form-urlencoded"
+    else:
+        body, content_type = json.dumps(data or {}).encode(), "application/json"
+    req = urllib.request.Request(f"{BASE_URL}{path}", data=body, method="POST")
+    req.add_header("Content-Type", content_type)
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req) as response:
+            text = response.read().decode()
+            return response.status, json.loads(text) if text else None
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+def get_status(path, token):
+    req = urllib.request.Request(f"{BASE_URL}{path}")
+    req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def test_refresh_flow():
+    try:
+        status, tokens = post("/api/auth/login", form={"username": "student", "password": "password"})
+        if status != 200:
+            print(f"FAILURE: Login returned {status}")
+            return
+        print("Login: OK")
+
+        status, renewed = post("/api/auth/refresh", {"refresh_token": tokens["refresh_token"]})
+        print(f"Refresh: {status}")
+        reused, _ = post("/api/auth/refresh", {"refresh_token": tokens["refresh_token"]})
+        print(f"Reusing rotated refresh token: {reused} (expected 401)")
+
+        status, _ = post("/api/auth/logout", {"refresh_token": renewed["refresh_token"]}, token=renewed["access_token"])
+        print(f"Logout: {status}")
+        after = get_status("/api/skills/me", renewed["access_token"])
+        print(f"Access token after logout: {after} (expected 401)")
+
+        if reused == 401 and after == 401:
+            print("SUCCESS: Refresh tokens rotate and logout revokes")
+        else:
+            print("FAILURE: Revocation not enforced")
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+if __name__ == "__main__":
+    test_refresh_flow()
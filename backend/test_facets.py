@@ -0,0 +1,55 @@
+import urllib.request
+import urllib.error
+import json
+
+BASE_URL = "http://localhost:8000"
+
+def get(path):
+    with urllib.request.urlopen(f"{BASE_URL}{path}") as response:
+        return json.loads(response.read().decode())
+
+def get_all(path):
+    # Every page of a course listing, following X-Next-Cursor
+    rows, cursor = [], None
+    while True:
+        page = f"{path}&cursor={cursor}" if cursor else path
+        with urllib.request.urlopen(f"{BASE_URL}{page}") as response:
+            rows += json.loads(response.read().decode())
+            cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+def test_facets():
+    print("Testing catalog facets...")
+    try:
+        # 1. Unfiltered totals match the catalog
+        facets = get("/api/courses/meta/facets")
+        catalog = get_all("/api/courses/?limit=500&fields=id")
+        if facets["total"] != len(catalog):
+            print(f"FAILURE: total {facets['total']} != {len(catalog)} courses")
+            return
+        print(f"Total OK: {facets['total']} courses")
+
+        # 2. Each year count matches the filtered course list
+        for year in facets["years"]:
+            courses = get_all(f"/api/courses/?year={year['value']}&limit=500&fields=id")
+            if len(courses) != year["count"]:
+                print(f"FAILURE: year {year['value']} count {year['count']} != {len(courses)} courses")
+                return
+        print(f"Year counts OK: {facets['years']}")
+
+        # 3. Selecting a year keeps the other years' counts (disjunctive facets)
+        if facets["years"]:
+            year = facets["years"][0]
+            filtered = get(f"/api/courses/meta/facets?year={year['value']}")
+            if filtered["total"] != year["count"] or filtered["years"] != facets["years"]:
+                print(f"FAILURE: Filtered facets inconsistent: {filtered}")
+                return
+        print("SUCCESS: Facet counts match the catalog")
+    except urllib.error.HTTPError as e:
+        print(f"FAILURE: {e.code} {e.read().decode()}")
+    except urllib.error.URLError as e:
+        print(f"Connection error: {e}. Is the server running?")
+
+if __name__ == "__main__":
+    test_facets()
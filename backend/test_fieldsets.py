@@ -0,0 +1,53 @@
+import urllib.request
+import urllib.error
+import json
+
+BASE_URL = "http://localhost:8000"
+
+def get(path):
+    with urllib.request.urlopen(f"{BASE_URL}{path}") as response:
+        return json.loads(response.read().decode())
+
+def test_fieldsets():
+    print("Testing sparse fieldsets...")
+    try:
+        # 1. Catalog cards: only the requested fields (plus id)
+        courses = get("/api/courses/?limit=5&fields=title,image_url")
+        if not courses:
+            print("FAILURE: No courses returned")
+            return
+        keys = {key for course in courses for key in course}
+        if keys != {"id", "title", "image_url"}:
+            print(f"FAILURE: Unexpected course fields {sorted(keys)}")
+            return
+        print(f"Catalog projection OK: {sorted(keys)}")
+
+        # 2. Full rows without fields=
+        full = get("/api/courses/?limit=5")
+        if "description" not in full[0]:
+            print("FAILURE: Full course rows lost their description")
+            return
+
+        # 3. Enrolled courses mix course columns and enrollment counters
+        mine = get("/api/users/me/courses?fields=title,progress_percent")
+        keys = {key for course in mine for key in course}
+        if mine and keys != {"id", "title", "progress_percent"}:
+            print(f"FAILURE: Unexpected enrolled course fields {sorted(keys)}")
+            return
+        print(f"Enrolled projection OK: {len(mine)} courses")
+
+        # 4. Unknown fields are rejected
+        try:
+            get("/api/courses/?fields=title,secret")
+            print("FAILURE: Unknown field was accepted")
+            return
+        except urllib.error.HTTPError as e:
+            if e.code != 400:
+                print(f"FAILURE: Expected 400 for unknown field, got {e.code}")
+                return
+        print("SUCCESS: Sparse fieldsets work")
+    except urllib.error.URLError as e:
+        print(f"Connection error: {e}. Is the server running?")
+
+if __name__ == "__main__":
+    test_fieldsets()
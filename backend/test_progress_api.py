@@ -58,5 +58,45 @@ def run_test():
     except Exception as e:
         print(f"Get Progress failed: {e}")
 
+    # 4. Batch Update (one transaction for several lessons, one unknown lesson)
+    print("\n4. Sending Batch Progress Update...")
+    batch_data = json.dumps([
+        {"lesson_id": 1, "completed": True, "score": 100},
+        {"lesson_id": 2, "completed": False},
+        {"lesson_id": 999999, "completed": True}
+    ]).encode()
+
+    req = urllib.request.Request(f"{base_url}/api/users/progress/batch", data=batch_data, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req) as response:
+            results = json.loads(response.read().decode())
+            statuses = [r['status'] for r in results]
+            print(f"Batch Results: {statuses}")
+            if statuses == ["ok", "ok", "error"]:
+                print("SUCCESS: Batch progress verified.")
+            else:
+                print("FAILURE: Unexpected batch results.")
+    except Exception as e:
+        print(f"Batch Progress failed: {e}")
+
+    # 5. Course progress is a whole percent, and the same number on every endpoint
+    print("\n5. Checking Course Progress Percentages...")
+    try:
+        req = urllib.request.Request(f"{base_url}/api/users/me/courses?fields=title,progress_percent", headers=headers, method="GET")
+        with urllib.request.urlopen(req) as response:
+            mine = {c['title']: c['progress_percent'] for c in json.loads(response.read().decode())}
+        req = urllib.request.Request(f"{base_url}/api/dashboard", headers=headers, method="GET")
+        with urllib.request.urlopen(req) as response:
+            shown = {c['title']: c['progress'] for c in json.loads(response.read().decode())['courses']}
+        print(f"Enrolled: {mine}")
+        if not all(type(p) is int for p in list(mine.values()) + list(shown.values())):
+            print("FAILURE: Progress percent is not an integer.")
+        elif mine != shown:
+            print(f"FAILURE: Dashboard progress {shown} differs from enrollments.")
+        else:
+            print("SUCCESS: Progress percentages verified.")
+    except Exception as e:
+        print(f"Progress Percentages failed: {e}")
+
 if __name__ == "__main__":
     run_test()
@@ -0,0 +1,107 @@
+import urllib.request
+import urllib.parse
+import urllib.error
+import json
+
+# Run the server with QUERY_BUDGET_MODE=enforce, e.g.
+#   QUERY_BUDGET_MODE=enforce uvicorn main:app
+# Endpoints that exceed their declared SQL statement budget answer 500.
+
+ENDPOINTS = [
+    "/api/dashboard",
+    "/api/courses/",
+    "/api/courses/?fields=id,title,image_url",
+    "/api/courses/1",
+    "/api/courses/meta/branches",
+    "/api/courses/meta/facets?year=2",
+    "/api/skills/",
+    "/api/skills/me",
+    "/api/users/me",
+    "/api/users/me/courses",
+    "/api/users/me/courses?fields=title,progress_percent",
+    "/api/users/progress/1",
+    "/api/search/?q=data",
+    "/api/search/suggest?q=da",
+]
+
+# Write-then-read sequences, run in order after the reads above
+SEQUENCES = [
+    # add a skill, then re-add it (conflict path) with the principal cached
+    [
+        ("POST", "/api/skills/me", {"skill_id": 1, "proficiency": 40, "verified": False}),
+        ("POST", "/api/skills/me", {"skill_id": 1, "proficiency": 60, "verified": False}),
+    ],
+    # buffered video heartbeat, then read the course progress before the flush
+    [
+        ("POST", "/api/users/progress", {"lesson_id": 4, "completed": False}),
+        ("GET", "/api/users/progress/1", None),
+        ("GET", "/api/users/progress/4", None),
+    ],
+]
+
+def check(base_url, headers, method, path, body=None):
+    # -> True if within budget
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(f"{base_url}{path}", data=data, headers=headers, method=method)
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req) as response:
+            print(f"OK   {method} {path}: {response.headers.get('X-SQL-Statements')} statements")
+            return True
+    except urllib.error.HTTPError as e:
+        print(f"FAIL {method} {path}: {e.code} {e.read().decode()}")
+        return False
+
+def run_test():
+    base_url = "http://localhost:8000"
+
+    # 1. Login
+    print("1. Logging in...")
+    login_data = urllib.parse.urlencode({
+        "username": "student",
+        "password": "password"
+    }).encode()
+
+    req = urllib.request.Request(f"{base_url}/api/auth/login", data=login_data, method="POST")
+    req.add_header("Content-Type", "application/x-www-form-urlencoded")
+
+    try:
+        with urllib.request.urlopen(req) as response:
+            token = json.loads(response.read().decode())["access_token"]
+            print("Login successful.")
+    except Exception as e:
+        print(f"Login failed: {e}")
+        return
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # 2. Hit each endpoint and report its statement count
+    print("\n2. Checking SQL statement budgets...")
+    failures = 0
+    for path in ENDPOINTS:
+        req = urllib.request.Request(f"{base_url}{path}", headers=headers, method="GET")
+        try:
+            with urllib.request.urlopen(req) as response:
+                count = response.headers.get("X-SQL-Statements")
+                if count is None:
+                    print("FAILURE: X-SQL-Statements header missing. Is QUERY_BUDGET_MODE set?")
+                    return
+                print(f"OK   {path}: {count} statements")
+        except urllib.error.HTTPError as e:
+            failures += 1
+            print(f"FAIL {path}: {e.code} {e.read().decode()}")
+
+    print("\n3. Checking write sequences...")
+    for sequence in SEQUENCES:
+        for method, path, body in sequence:
+            if not check(base_url, headers, method, path, body):
+                failures += 1
+
+    if failures:
+        print(f"\nFAILURE: {failures} endpoint(s) over budget.")
+    else:
+        print("\nSUCCESS: All endpoints within budget.")
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,56 @@
+import urllib.request
+import json
+import uuid
+
+BASE_URL = "http://localhost:8000"
+
+def post_files(path, field, documents):
+    # documents: [(filename, text)] sent as one multipart form
+    boundary = uuid.uuid4().hex
+    body = "".join(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+        f"{content}\r\n"
+        for filename, content in documents
+    ) + f"--{boundary}--\r\n"
+    req = urllib.request.Request(f"{BASE_URL}{path}", data=body.encode(), method="POST")
+    req.add_header("Content-Type", f"multipart/form-data; boundary={boundary}")
+    return urllib.request.urlopen(req)
+
+def upload(path, filename, content):
+    with post_files(path, "file", [(filename, content)]) as response:
+        return json.loads(response.read().decode())
+
+def test_resume_analysis():
+    try:
+        # Skills are matched on whole words, case-insensitively, including multi-word names
+        result = upload("/api/resume/analyze", "resume.txt",
+                        "Built PYTHON services and ran network security audits. Not a pythonista.")
+        print(f"Role: {result['match_role']} ({result['score']})")
+        print(f"Found: {result['skills_found']}")
+        print(f"Missing: {result['missing_skills']}")
+        if "Python" in result["skills_found"] and "Network Security" in result["skills_found"]:
+            print("SUCCESS: Skills extracted")
+        else:
+            print("FAILURE: Expected Python and Network Security")
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+def test_resume_bulk():
+    try:
+        documents = [(f"student{i}.txt", f"Student {i}: react and algorithms") for i in range(10)]
+        with post_files("/api/resume/analyze/bulk", "files", documents) as response:
+            lines = [json.loads(line) for line in response if line.strip()]
+        completed = [line for line in lines if line["status"] == "completed"]
+        print(f"Bulk: {len(completed)}/{len(documents)} completed")
+        if sorted(line["index"] for line in lines) == list(range(len(documents))) and len(completed) == len(documents):
+            print("SUCCESS: Bulk analysis streamed every resume")
+        else:
+            print(f"FAILURE: {lines}")
+    except Exception as e:
+        print(f"Connection Failed: {e}")
+
+if __name__ == "__main__":
+    test_resume_analysis()
+    test_resume_bulk()
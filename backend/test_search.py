@@ -0,0 +1,117 @@
+import urllib.request
+import urllib.parse
+import urllib.error
+import json
+import time
+
+BASE_URL = "http://localhost:8000"
+
+def search(**params):
+    with urllib.request.urlopen(f"{BASE_URL}/api/search/?{urllib.parse.urlencode(params)}") as response:
+        return json.loads(response.read().decode())
+
+def test_search():
+    print("Testing full-text search...")
+    try:
+        # 1. Pick a course title from the catalog and search for its first word
+        with urllib.request.urlopen(f"{BASE_URL}/api/courses/?limit=1&fields=title") as response:
+            courses = json.loads(response.read().decode())
+        if not courses:
+            print("FAILURE: No courses to search for")
+            return
+        course = courses[0]
+        word = course["title"].split()[0]
+        print(f"Searching for '{word}'...")
+
+        data = search(q=word)
+        hits = [hit for hit in data["results"] if hit["type"] == "course" and hit["id"] == course["id"]]
+        if not hits:
+            print(f"FAILURE: Course {course['id']} not found for '{word}'")
+            return
+        if "<mark>" not in hits[0]["title"]:
+            print(f"FAILURE: Title not highlighted: {hits[0]['title']}")
+            return
+        print(f"Found: {hits[0]['title']} (score {hits[0]['score']:.2f})")
+
+        # 2. Prefix matching on the last word
+        prefix = word[:3]
+        if not search(q=prefix, type="course")["results"]:
+            print(f"FAILURE: Prefix '{prefix}' matched nothing")
+            return
+
+        # 3. Scores are ranked best first
+        scores = [hit["score"] for hit in data["results"]]
+        if scores != sorted(scores, reverse=True):
+            print(f"FAILURE: Results not ranked: {scores}")
+            return
+
+        # 4. Pages don't overlap
+        first = search(q=word, limit=1)
+        if first["next_skip"] is not None:
+            second = search(q=word, limit=1, skip=first["next_skip"])
+            if second["results"] and second["results"][0] == first["results"][0]:
+                print("FAILURE: Second page repeats the first")
+                return
+
+        # 5. Query syntax in user input is treated as plain words
+        search(q='" OR NEAR(*')
+
+        # 6. Markup in course text is escaped; only the highlight tags are HTML
+        marker = f"xsscheck{int(time.time())}"
+        post_json("/api/courses/", {"title": f"{marker} <img src=x onerror=alert(1)>", "description": "<script>alert(1)</script>", "category": "CSE"})
+        hit = search(q=marker, type="course")["results"][0]
+        if "<img" in hit["title"] or "&lt;img" not in hit["title"] or "<mark>" not in hit["title"]:
+            print(f"FAILURE: Title markup not escaped: {hit['title']}")
+            return
+        print("SUCCESS: Search works")
+    except urllib.error.HTTPError as e:
+        print(f"FAILURE: {e.code} {e.read().decode()}")
+    except urllib.error.URLError as e:
+        print(f"Connection error: {e}. Is the server running?")
+
+def suggest(**params):
+    with urllib.request.urlopen(f"{BASE_URL}/api/search/suggest?{urllib.parse.urlencode(params)}") as response:
+        return json.loads(response.read().decode())
+
+def post_json(path, payload):
+    req = urllib.request.Request(f"{BASE_URL}{path}", data=json.dumps(payload).encode(), method="POST")
+    req.add_header("Content-Type", "application/json")
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read().decode())
+
+def test_suggest():
+    print("Testing typeahead suggestions...")
+    try:
+        # 1. A new course is suggested right away, from any word of its title
+        title = f"Typeahead Testing {int(time.time())}"
+        course = post_json("/api/courses/", {"title": title, "description": "Suggest test", "category": "CSE"})
+        for prefix in ("typea", "testing " + title.split()[-1][:4]):
+            hits = suggest(q=prefix, type="course")
+            if not any(hit["id"] == course["id"] for hit in hits):
+                print(f"FAILURE: '{prefix}' did not suggest course {course['id']}: {hits}")
+                return
+        print(f"New course suggested: {title}")
+
+        # 2. Results are ordered by popularity and capped by limit
+        hits = suggest(q="d", limit=3)
+        if len(hits) > 3:
+            print(f"FAILURE: limit ignored, got {len(hits)}")
+            return
+        popularity = [hit["popularity"] for hit in hits]
+        if popularity != sorted(popularity, reverse=True):
+            print(f"FAILURE: Not ranked by popularity: {popularity}")
+            return
+
+        # 3. Type filter
+        if any(hit["type"] != "skill" for hit in suggest(q="p", type="skill")):
+            print("FAILURE: Type filter ignored")
+            return
+        print("SUCCESS: Suggestions work")
+    except urllib.error.HTTPError as e:
+        print(f"FAILURE: {e.code} {e.read().decode()}")
+    except urllib.error.URLError as e:
+        print(f"Connection error: {e}. Is the server running?")
+
+if __name__ == "__main__":
+    test_search()
+    test_suggest()
@@ -10,6 +10,14 @@ const Courses = () => {
     const [loading, setLoading] = useState(true);
     const [selectedBranch, setSelectedBranch] = useState(null);
     const [selectedYear, setSelectedYear] = useState(null);
+    const [facets, setFacets] = useState(null);
+
+    // Course count for a filter value, e.g. facetCount('branches', 1)
+    const facetCount = (facet, value) => {
+        if (!facets) return null;
+        const match = facets[facet].find(f => f.value === value);
+        return match ? match.count : 0;
+    };
 
     useEffect(() => {
         const fetchData = async () => {
@@ -25,7 +33,11 @@ const Courses = () => {
                 if (selectedBranch) params.append('branch_id', selectedBranch);
                 if (selectedYear) params.append('year', selectedYear);
 
-                const response = await api.get(`${url}?${params.toString()}`);
+                const [response, facetRes] = await Promise.all([
+                    api.get(`${url}?${params.toString()}`),
+                    api.get(`/api/courses/meta/facets?${params.toString()}`)
+                ]);
+                setFacets(facetRes.data);
 
                 const data = response.data.map(c => ({
                     ...c,
@@ -66,6 +78,7 @@ const Courses = () => {
                                 className={`w-full text-left px-3 py-2 rounded-lg text-sm transition ${selectedBranch === b.id ? 'bg-blue-600 text-white' : 'text-slate-400 hover:bg-slate-800'}`}
                             >
                                 {b.code}
+                                {facets && <span className="float-right text-xs opacity-70">{facetCount('branches', b.id)}</span>}
                             </button>
                         ))}
                     </div>
@@ -82,6 +95,7 @@ const Courses = () => {
                                 className={`w-full text-left px-3 py-2 rounded-lg text-sm transition ${selectedYear === y ? 'bg-blue-600 text-white' : 'text-slate-400 hover:bg-slate-800'}`}
                             >
                                 {y}st Year
+                                {facets && <span className="float-right text-xs opacity-70">{facetCount('years', y)}</span>}
                             </button>
                         ))}
                     </div>
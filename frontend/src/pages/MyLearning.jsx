@@ -11,7 +11,7 @@ const MyLearning = () => {
     useEffect(() => {
         const fetchMyCourses = async () => {
             try {
-                const response = await api.get('/api/users/me/courses');
+                const response = await api.get('/api/users/me/courses?fields=id,title,image_url');
                 // Enhance with image if missing
                 const data = response.data.map(c => ({
                     ...c,